@@ -1,30 +1,30 @@
-from flask import Flask, request, jsonify
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+import time
+_import_started = time.perf_counter()
+
+import click
+import os
+import subprocess
+import sys
+from flask import Flask, current_app, jsonify
+from flask.cli import with_appcontext
+from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from datetime import datetime, timedelta
-import os
 from dotenv import load_dotenv
 from database import db, bcrypt
 
-load_dotenv()
-
-app = Flask(__name__)
-
-# Configuration
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///task_management.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-string')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
-
-# Initialize extensions
-db.init_app(app)
-jwt = JWTManager(app)
-bcrypt.init_app(app)
-CORS(app)
-
 # Import models
-from models import User, Task, Deployment, Incident, RCA, Asset
+from models import User
+from changes import tombstones_cli  # importing registers table change tracking
+from identity import init_identity
+from notifications import init_notifications
+from passwords import password_pool_stats
+from search_cache import search_cache_stats
+from dashboard import dashboard_cache_stats
+from charts import chart_stats
+from jobs import export_job_stats
+from search_index import ensure_search_index
+from counters import counters_cli, ensure_counters
 
 # Import routes
 from routes.auth import auth_bp
@@ -34,27 +34,155 @@ from routes.deployments import deployments_bp
 from routes.incidents import incidents_bp
 from routes.rca import rca_bp
 from routes.assets import assets_bp
-from routes.simple_reports import reports_bp
+from routes.reports import reports_bp
 from routes.search import search_bp
+from routes.sync import sync_bp
+from routes.events import events_bp
 
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(users_bp, url_prefix='/api/users')
-app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
-app.register_blueprint(deployments_bp, url_prefix='/api/deployments')
-app.register_blueprint(incidents_bp, url_prefix='/api/incidents')
-app.register_blueprint(rca_bp, url_prefix='/api/rca')
-app.register_blueprint(assets_bp, url_prefix='/api/assets')
-app.register_blueprint(reports_bp, url_prefix='/api/reports')
-app.register_blueprint(search_bp, url_prefix='/api/search')
+load_dotenv()
 
-@app.route('/api/health')
-def health_check():
-    return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()})
+# Import plus create_app; heavy report libraries load on first use instead
+DEFAULT_BOOT_BUDGET_SECONDS = 2.0
 
-def create_tables():
+def create_app(test_config=None):
+    """Build and configure the Flask application"""
+    factory_started = time.perf_counter()
+    app = Flask(__name__)
+    
+    # Configuration
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///task_management.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-string')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+    # Only /api/events also accepts ?jwt=, because EventSource cannot send headers
+    app.config['JWT_TOKEN_LOCATION'] = ['headers']
+    # Changing the cost takes effect as users log in; older hashes are upgraded then
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    if os.environ.get('PASSWORD_HASH_WORKERS'):
+        app.config['PASSWORD_HASH_WORKERS'] = int(os.environ['PASSWORD_HASH_WORKERS'])
+    if os.environ.get('CHART_RENDER_WORKERS'):
+        app.config['CHART_RENDER_WORKERS'] = int(os.environ['CHART_RENDER_WORKERS'])
+    # Seconds a cached dashboard may lag behind writes to spare a recompute (0 = always current)
+    app.config['DASHBOARD_MAX_STALENESS'] = float(os.environ.get('DASHBOARD_MAX_STALENESS', 0))
+    # Days deletions are kept for delta sync; older sync tokens must resync from scratch
+    app.config['SYNC_RETENTION_DAYS'] = int(os.environ.get('SYNC_RETENTION_DAYS', 30))
+    # Background exports: where finished files are kept, for how long, and how many build at once
+    app.config['EXPORT_DIR'] = os.environ.get('EXPORT_DIR')
+    app.config['EXPORT_TTL_SECONDS'] = int(os.environ.get('EXPORT_TTL_SECONDS', 3600))
+    if os.environ.get('EXPORT_JOB_WORKERS'):
+        app.config['EXPORT_JOB_WORKERS'] = int(os.environ['EXPORT_JOB_WORKERS'])
+    app.config['BOOT_BUDGET_SECONDS'] = float(os.environ.get('BOOT_BUDGET_SECONDS', DEFAULT_BOOT_BUDGET_SECONDS))
+    if test_config:
+        app.config.update(test_config)
+    
+    # Initialize extensions
+    db.init_app(app)
+    jwt = JWTManager(app)
+    bcrypt.init_app(app)
+    CORS(app)
+    
+    init_identity(jwt)
+    init_notifications(app, db)
+    
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(users_bp, url_prefix='/api/users')
+    app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
+    app.register_blueprint(deployments_bp, url_prefix='/api/deployments')
+    app.register_blueprint(incidents_bp, url_prefix='/api/incidents')
+    app.register_blueprint(rca_bp, url_prefix='/api/rca')
+    app.register_blueprint(assets_bp, url_prefix='/api/assets')
+    app.register_blueprint(reports_bp, url_prefix='/api/reports')
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
+    
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(tombstones_cli)
+    app.cli.add_command(boot_check_command)
+    app.cli.add_command(init_db_command)
+    
+    @app.route('/api/health')
+    def health_check():
+        return jsonify({
+            'status': 'healthy',
+            'timestamp': datetime.utcnow().isoformat(),
+            'boot_seconds': app.config['BOOT_SECONDS'],
+            'password_pool': password_pool_stats(),
+            'search_cache': search_cache_stats(),
+            'dashboard_cache': dashboard_cache_stats(),
+            'charts': chart_stats(),
+            'export_jobs': export_job_stats()
+        })
+    
+    app.config['BOOT_SECONDS'] = round(_import_seconds + time.perf_counter() - factory_started, 3)
+    if app.config['BOOT_SECONDS'] > app.config['BOOT_BUDGET_SECONDS']:
+        app.logger.warning(
+            'Boot took %.2fs, over the %.2fs budget', app.config['BOOT_SECONDS'], app.config['BOOT_BUDGET_SECONDS']
+        )
+    
+    return app
+
+@click.command('boot-check')
+@with_appcontext
+def boot_check_command():
+    """Time a cold import and create_app in a fresh interpreter against the boot budget"""
+    result = subprocess.run(
+        [sys.executable, '-c', 'import app; print(app.create_app().config["BOOT_SECONDS"])'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+    )
+    boot_seconds = float(result.stdout.strip().splitlines()[-1])
+    budget = current_app.config['BOOT_BUDGET_SECONDS']
+    if boot_seconds > budget:
+        raise click.ClickException(f'Boot took {boot_seconds:.2f}s, over the {budget:.2f}s budget')
+    click.echo(f'Boot took {boot_seconds:.2f}s (budget {budget:.2f}s)')
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create missing tables, indexes and counters; safe to run on every deploy"""
+    create_tables(current_app._get_current_object())
+    click.echo('Database is up to date')
+
+def upgrade_schema():
+    """Add columns introduced after a database was first created"""
+    inspector = db.inspect(db.engine)
+    # Column types spelled the way this database names them (TIMESTAMP on PostgreSQL)
+    datetime_type = db.DateTime().compile(dialect=db.engine.dialect)
+    with db.engine.begin() as connection:
+        for table_name in ['users', 'tasks', 'deployments', 'incidents', 'rca', 'assets']:
+            columns = {column['name'] for column in inspector.get_columns(table_name)}
+            if 'updated_at' not in columns:
+                connection.execute(db.text(f'ALTER TABLE {table_name} ADD COLUMN updated_at {datetime_type}'))
+                connection.execute(db.text(f'UPDATE {table_name} SET updated_at = created_at'))
+            connection.execute(db.text(
+                f'CREATE INDEX IF NOT EXISTS ix_{table_name}_updated_at ON {table_name} (updated_at)'
+            ))
+        
+        user_columns = {column['name'] for column in inspector.get_columns('users')}
+        if 'auth_version' not in user_columns:
+            connection.execute(db.text('ALTER TABLE users ADD COLUMN auth_version INTEGER NOT NULL DEFAULT 0'))
+        
+        tombstone_columns = {column['name'] for column in inspector.get_columns('tombstones')}
+        if 'kind' not in tombstone_columns:
+            connection.execute(db.text(
+                "ALTER TABLE tombstones ADD COLUMN kind VARCHAR(10) NOT NULL DEFAULT 'deleted'"
+            ))
+        
+        # Identifier columns served by the search fast path
+        for column in ['serial_number', 'ip_address', 'host_name']:
+            connection.execute(db.text(f'CREATE INDEX IF NOT EXISTS ix_assets_{column} ON assets ({column})'))
+        if db.engine.dialect.name == 'postgresql':
+            # Room for IPv6 addresses
+            connection.execute(db.text('ALTER TABLE assets ALTER COLUMN ip_address TYPE VARCHAR(45)'))
+
+def create_tables(app):
     with app.app_context():
         db.create_all()
+        upgrade_schema()
+        ensure_search_index()
+        ensure_counters()
         
         # Create super admin if no users exist
         if not User.query.first():
@@ -69,6 +197,9 @@ def create_tables():
             db.session.commit()
             print("Super Admin created - Username: superadmin, Password: SuperAdmin123!")
 
+_import_seconds = time.perf_counter() - _import_started
+
 if __name__ == '__main__':
-    create_tables()
+    app = create_app()
+    create_tables(app)
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,180 @@
+import click
+import logging
+from collections import namedtuple
+from datetime import datetime, timedelta
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import Session, object_session
+from database import db, add_to_row
+from models import User, Task, Deployment, Incident, RCA, Asset, TableVersion, Tombstone, MEMBER_SCOPE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+TRACKED_MODELS = (User, Task, Deployment, Incident, RCA, Asset)
+
+# Tombstones older than this may be pruned, so delta sync cannot catch up
+# from before it and clients must resync from scratch
+DEFAULT_SYNC_RETENTION_DAYS = 30
+
+# One committed row change. scope_user_ids holds every user the row was
+# visible to as a member, before and after the change.
+Change = namedtuple('Change', ['table_name', 'action', 'record_id', 'scope_user_ids'])
+
+_commit_listeners = []
+
+# Attributes whose previous value is loaded on assignment
+_active_history = set()
+
+def on_commit(listener):
+    """Register listener(changes) to run after each commit that wrote tracked rows"""
+    _commit_listeners.append(listener)
+    return listener
+
+def _scope_user_ids(mapper, target):
+    state = inspect(target)
+    user_ids = set()
+    for column in MEMBER_SCOPE_COLUMNS[mapper.class_]:
+        history = state.attrs[column].history
+        user_ids.update(history.deleted)
+        user_ids.add(getattr(target, column))
+    user_ids.discard(None)
+    return frozenset(user_ids)
+
+def _change_recorder(action):
+    def record(mapper, connection, target):
+        session = object_session(target)
+        if session is None:
+            return
+        table_name = mapper.local_table.name
+        session.info.setdefault('changed_tables', set()).add(table_name)
+        session.info.setdefault('pending_changes', []).append(
+            Change(table_name, action, target.id, _scope_user_ids(mapper, target))
+        )
+    return record
+
+def _record_tombstone(mapper, connection, target):
+    """Remember a deleted row, with the users who could see it, for delta sync"""
+    scope_columns = MEMBER_SCOPE_COLUMNS[mapper.class_]
+    scope_user_ids = [getattr(target, column) for column in scope_columns] + [None]
+    connection.execute(insert(Tombstone.__table__).values(
+        table_name=mapper.local_table.name,
+        record_id=target.id,
+        scope_user_id=scope_user_ids[0],
+        alt_scope_user_id=scope_user_ids[1],
+        kind='deleted',
+        deleted_at=datetime.utcnow()
+    ))
+
+def _scope_exits(mapper, target):
+    """Users who could see target as a member before this update and no longer can"""
+    state = inspect(target)
+    before, after = set(), set()
+    for column in MEMBER_SCOPE_COLUMNS[mapper.class_]:
+        history = state.attrs[column].history
+        current = getattr(target, column)
+        before.update(history.deleted if history.deleted else [current])
+        after.add(current)
+    return (before - after) - {None}
+
+def _record_scope_exit(mapper, connection, target):
+    """Tombstone a row for each member it moved away from, so their delta sync drops it"""
+    user_ids = _scope_exits(mapper, target)
+    if not user_ids:
+        return
+    deleted_at = datetime.utcnow()
+    connection.execute(insert(Tombstone.__table__), [
+        dict(
+            table_name=mapper.local_table.name,
+            record_id=target.id,
+            scope_user_id=user_id,
+            alt_scope_user_id=None,
+            kind='left_scope',
+            deleted_at=deleted_at
+        )
+        for user_id in sorted(user_ids)
+    ])
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    pass
+
+def load_previous_values(model, columns):
+    """Load the old value of each column on assignment, even if it was expired.
+
+    Listeners that compare a row before and after an update need this; each
+    attribute gets the listener once, however many of them ask for it.
+    """
+    for column in columns:
+        if (model, column) in _active_history:
+            continue
+        _active_history.add((model, column))
+        event.listen(getattr(model, column), 'set', _load_previous_value, active_history=True)
+
+for _model in TRACKED_MODELS:
+    event.listen(_model, 'after_insert', _change_recorder('created'))
+    event.listen(_model, 'after_update', _change_recorder('updated'))
+    event.listen(_model, 'after_delete', _change_recorder('deleted'))
+    event.listen(_model, 'after_delete', _record_tombstone)
+    event.listen(_model, 'after_update', _record_scope_exit)
+    # So an update always knows whose scope the row left
+    load_previous_values(_model, MEMBER_SCOPE_COLUMNS[_model])
+
+@event.listens_for(Session, 'after_flush')
+def _bump_table_versions(session, flush_context):
+    """Bump the version of every table written in this flush, once per table.
+
+    Runs on the flush's own connection, so the bump commits or rolls back
+    together with the rows that caused it.
+    """
+    tables = session.info.pop('changed_tables', None)
+    if not tables:
+        return
+
+    connection = session.connection()
+    for table_name in sorted(tables):
+        add_to_row(connection, TableVersion.__table__, {'table_name': table_name}, 'version', 1)
+
+@event.listens_for(Session, 'after_commit')
+def _notify_commit_listeners(session):
+    changes = session.info.pop('pending_changes', None)
+    if not changes:
+        return
+    # The data is already committed; a failing listener must not fail the request
+    for listener in _commit_listeners:
+        try:
+            listener(changes)
+        except Exception:
+            logger.exception('Commit listener %r failed', listener)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_changes(session):
+    session.info.pop('pending_changes', None)
+    session.info.pop('changed_tables', None)
+
+def get_table_versions(table_names):
+    """Return {table_name: version} for table_names in a single query"""
+    rows = db.session.query(TableVersion.table_name, TableVersion.version).filter(
+        TableVersion.table_name.in_(table_names)
+    ).all()
+    versions = dict(rows)
+    return {table_name: versions.get(table_name, 0) for table_name in table_names}
+
+def sync_retention_cutoff():
+    """The oldest moment a delta sync can still catch up from"""
+    days = current_app.config.get('SYNC_RETENTION_DAYS', DEFAULT_SYNC_RETENTION_DAYS)
+    return datetime.utcnow() - timedelta(days=days)
+
+def prune_tombstones():
+    """Delete tombstones past the sync retention window and return how many went"""
+    pruned = db.session.query(Tombstone).filter(
+        Tombstone.deleted_at < sync_retention_cutoff()
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return pruned
+
+tombstones_cli = AppGroup('tombstones', help='Maintain the deletion records kept for delta sync.')
+
+@tombstones_cli.command('prune')
+def prune_tombstones_command():
+    """Delete tombstones older than SYNC_RETENTION_DAYS"""
+    click.echo(f'Pruned {prune_tombstones()} tombstones')
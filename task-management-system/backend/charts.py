@@ -0,0 +1,153 @@
+import base64
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from executors import gevent_patched, native_thread_pool
+
+DEFAULT_RENDER_WORKERS = 2
+CHART_CACHE_SIZE = 128
+RENDER_TIMEOUT_SECONDS = 30
+
+def render_chart(chart_type, data, title, labels=None):
+    """Render a chart to a base64 encoded PNG.
+
+    Runs in a worker process. It uses matplotlib's object API rather than
+    pyplot, so no global figure state is involved.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+
+    if chart_type == 'bar':
+        if labels:
+            axes.bar(labels, data)
+        else:
+            axes.bar(range(len(data)), data)
+    elif chart_type == 'pie':
+        axes.pie(data, labels=labels, autopct='%1.1f%%')
+    elif chart_type == 'line':
+        axes.plot(data)
+
+    axes.set_title(title)
+    figure.tight_layout()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    return base64.b64encode(buffer.getvalue()).decode()
+
+def chart_key(chart_type, data, title, labels=None):
+    """Hash identifying a chart by everything that affects its pixels"""
+    raw = json.dumps([chart_type, list(data), title, list(labels) if labels else None], default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class ChartRenderer:
+    """Renders charts on a process pool and memoizes them by chart_key.
+
+    Finished charts are kept in an LRU. A chart being rendered is tracked
+    as a future, so concurrent requests for it wait on the same render.
+    Under gevent the renders run on native threads in the worker instead,
+    since the process pool's helper threads would be greenlets there.
+    """
+
+    def __init__(self, workers=DEFAULT_RENDER_WORKERS, cache_size=CHART_CACHE_SIZE):
+        self.workers = workers
+        self.cache_size = cache_size
+        # Reentrant: a render that is already done runs its callback on add
+        self._lock = threading.RLock()
+        self._pool = None
+        self._pool_pid = None
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._renders = 0
+        self._hits = 0
+        self._shared = 0
+
+    def _get_pool(self):
+        if self._pool is None:
+            if gevent_patched():
+                self._pool = native_thread_pool(self.workers, 'chart')
+            else:
+                # Spawned workers do not inherit the web worker's threads or open connections
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            self._pool_pid = os.getpid()
+        return self._pool
+
+    def render(self, chart_type, data, title, labels=None):
+        key = chart_key(chart_type, data, title, labels)
+
+        with self._lock:
+            if self._pool_pid not in (None, os.getpid()):
+                # Forked since the pool was made: its workers and renders stay with the parent
+                self._pool = None
+                self._in_flight.clear()
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return image
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._shared += 1
+            else:
+                try:
+                    future = self._get_pool().submit(render_chart, chart_type, list(data), title, labels)
+                except BrokenProcessPool:
+                    self._pool = None
+                    future = self._get_pool().submit(render_chart, chart_type, list(data), title, labels)
+                self._in_flight[key] = future
+                self._renders += 1
+                future.add_done_callback(lambda done: self._finish(key, done))
+
+        return future.result(timeout=RENDER_TIMEOUT_SECONDS)
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                if isinstance(future.exception(), BrokenProcessPool):
+                    self._pool = None
+                return
+            self._cache[key] = future.result()
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'cached': len(self._cache),
+                'in_flight': len(self._in_flight),
+                'renders': self._renders,
+                'hits': self._hits,
+                'shared_renders': self._shared
+            }
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+def get_renderer():
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = ChartRenderer(current_app.config.get('CHART_RENDER_WORKERS', DEFAULT_RENDER_WORKERS))
+    return _renderer
+
+def create_chart(chart_type, data, title, labels=None):
+    """Create a chart and return base64 encoded image"""
+    return get_renderer().render(chart_type, data, title, labels)
+
+def chart_stats():
+    return get_renderer().stats() if _renderer is not None else None
@@ -0,0 +1,259 @@
+import click
+from collections import Counter, namedtuple
+from datetime import date, datetime
+from flask.cli import AppGroup
+from sqlalchemy import delete, event, insert, inspect
+from sqlalchemy.orm import Session, object_session
+from database import db, add_to_row
+from changes import load_previous_values
+from models import Task, Deployment, Incident, RCA, Asset, StatusCounter, DailyRollup
+
+# Model -> (counted columns, columns naming the users whose dashboards show the row)
+COUNTED_MODELS = {
+    Task: (('status', 'priority'), ('assigned_to', 'created_by')),
+    Deployment: (('status',), ('deployed_by',)),
+    Incident: (('status', 'severity'), ('assigned_to', 'created_by')),
+    RCA: (('status',), ()),
+    Asset: (('asset_type', 'asset_value_rating'), ('owner_id',)),
+}
+
+# Rollup metric -> (model, column giving the day, column broken down by or None)
+ROLLUPS = {
+    'tasks_created': (Task, 'created_at', None),
+    'tasks_completed': (Task, 'completed_at', None),
+    'incidents': (Incident, 'incident_date', 'severity'),
+    'deployments': (Deployment, 'deployment_date', 'status'),
+}
+
+ALL_SCOPE = 'all'
+REBUILD_BATCH_SIZE = 5000
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+def _stored_value(value):
+    return '' if value is None else str(value)
+
+def counter_keys(model, values):
+    """Keys of the status counters a row with values ({column: value}) adds one to.
+
+    A row counts once in the shared scope and once per distinct user it
+    belongs to, so a task both created by and assigned to someone counts
+    once on their dashboard.
+    """
+    counted_columns, scope_columns = COUNTED_MODELS[model]
+    scopes = {ALL_SCOPE} | {user_scope(values[column]) for column in scope_columns if values[column] is not None}
+    return [
+        (model.__tablename__, column, _stored_value(values[column]), scope)
+        for column in counted_columns
+        for scope in sorted(scopes)
+    ]
+
+def rollup_keys(model, values):
+    """Keys of the daily rollups a row with values adds one to"""
+    keys = []
+    for metric, (rollup_model, day_column, value_column) in ROLLUPS.items():
+        if rollup_model is not model or values[day_column] is None:
+            continue
+        day = values[day_column]
+        if isinstance(day, datetime):
+            day = day.date()
+        value = _stored_value(values[value_column]) if value_column else ''
+        keys.append((metric, day, value))
+    return keys
+
+# A family of counts kept in step with the entity tables: the table holding
+# them, the columns each model's keys are computed from, and the key function.
+# Keys are tuples in the order of the table's primary key.
+Tally = namedtuple('Tally', ['name', 'model', 'columns', 'keys'])
+
+TALLIES = [
+    Tally('status_counters', StatusCounter, {
+        model: counted_columns + scope_columns
+        for model, (counted_columns, scope_columns) in COUNTED_MODELS.items()
+    }, counter_keys),
+    Tally('daily_rollups', DailyRollup, {
+        model: tuple(dict.fromkeys(
+            column
+            for rollup_model, day_column, value_column in ROLLUPS.values() if rollup_model is model
+            for column in (day_column, value_column) if column
+        ))
+        for model in {rollup_model for rollup_model, _, _ in ROLLUPS.values()}
+    }, rollup_keys),
+]
+
+def _current_values(columns, target):
+    return {column: getattr(target, column) for column in columns}
+
+def _previous_values(columns, target):
+    state = inspect(target)
+    values = {}
+    for column in columns:
+        history = state.attrs[column].history
+        values[column] = history.deleted[0] if history.deleted else getattr(target, column)
+    return values
+
+def _deltas(target, tally):
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault('tally_deltas', {}).setdefault(tally.name, Counter())
+
+def _tally_recorder(tally, action):
+    def record(mapper, connection, target):
+        deltas = _deltas(target, tally)
+        if deltas is None:
+            return
+        model = mapper.class_
+        columns = tally.columns[model]
+        if action == 'insert':
+            removed, added = [], tally.keys(model, _current_values(columns, target))
+        elif action == 'delete':
+            removed, added = tally.keys(model, _previous_values(columns, target)), []
+        else:
+            previous = _previous_values(columns, target)
+            current = _current_values(columns, target)
+            if previous == current:
+                return
+            removed, added = tally.keys(model, previous), tally.keys(model, current)
+        for key in removed:
+            deltas[key] -= 1
+        for key in added:
+            deltas[key] += 1
+    return record
+
+for _tally in TALLIES:
+    for _model, _columns in _tally.columns.items():
+        event.listen(_model, 'after_insert', _tally_recorder(_tally, 'insert'))
+        event.listen(_model, 'after_update', _tally_recorder(_tally, 'update'))
+        event.listen(_model, 'after_delete', _tally_recorder(_tally, 'delete'))
+        # So updates always know which counts to move the row out of
+        load_previous_values(_model, _columns)
+
+def _key_columns(tally):
+    return [column.name for column in tally.model.__table__.primary_key.columns]
+
+@event.listens_for(Session, 'after_flush')
+def _apply_tally_deltas(session, flush_context):
+    """Add this flush's count deltas on the flush's own connection.
+
+    The counts commit or roll back together with the rows that moved them.
+    """
+    pending = session.info.pop('tally_deltas', None)
+    if not pending:
+        return
+
+    connection = session.connection()
+    for tally in TALLIES:
+        deltas = pending.get(tally.name)
+        if not deltas:
+            continue
+        table = tally.model.__table__
+        key_columns = _key_columns(tally)
+        # A fixed order keeps concurrent flushes from deadlocking on count rows
+        for key, delta in sorted(deltas.items()):
+            if delta == 0:
+                continue
+            add_to_row(connection, table, dict(zip(key_columns, key)), 'count', delta)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_tally_deltas(session):
+    session.info.pop('tally_deltas', None)
+
+def scope_counts(scope):
+    """{(table_name, column_name): {value: count}} for one scope, in a single query"""
+    rows = db.session.query(
+        StatusCounter.table_name, StatusCounter.column_name, StatusCounter.value, StatusCounter.count
+    ).filter(StatusCounter.scope == scope, StatusCounter.count != 0).all()
+
+    counts = {}
+    for table_name, column_name, value, count in rows:
+        counts.setdefault((table_name, column_name), {})[value or None] = count
+    return counts
+
+def rollup_counts(metrics, start_day, end_day):
+    """{metric: {day: {value: count}}} for metrics from start_day to end_day inclusive, in a single query"""
+    rows = db.session.query(
+        DailyRollup.metric, DailyRollup.day, DailyRollup.value, DailyRollup.count
+    ).filter(
+        DailyRollup.metric.in_(metrics), DailyRollup.day >= start_day, DailyRollup.day <= end_day,
+        DailyRollup.count != 0
+    ).all()
+
+    counts = {metric: {} for metric in metrics}
+    for metric, day, value, count in rows:
+        counts[metric].setdefault(day, {})[value or None] = count
+    return counts
+
+def expected_counts(tally):
+    """Recount one tally from the entity tables"""
+    expected = Counter()
+    for model, columns in tally.columns.items():
+        rows = db.session.query(*[getattr(model, column) for column in columns]).yield_per(REBUILD_BATCH_SIZE)
+        for row in rows:
+            for key in tally.keys(model, dict(zip(columns, row))):
+                expected[key] += 1
+    return expected
+
+def _stored_counts(tally):
+    key_columns = _key_columns(tally)
+    return {
+        tuple(getattr(row, column) for column in key_columns): row.count
+        for row in tally.model.query.all()
+    }
+
+def counter_drift(tally):
+    """{key: (stored, actual)} for every count in tally that disagrees with the tables"""
+    expected = expected_counts(tally)
+    stored = _stored_counts(tally)
+    return {
+        key: (stored.get(key, 0), expected.get(key, 0))
+        for key in set(stored) | set(expected)
+        if stored.get(key, 0) != expected.get(key, 0)
+    }
+
+def rebuild_counters(tally):
+    """Replace the stored counts of tally with a fresh count of the tables.
+
+    Writes made while the recount runs may be missed, so run it while the
+    application is quiet and verify afterwards.
+    """
+    expected = expected_counts(tally)
+    key_columns = _key_columns(tally)
+    db.session.execute(delete(tally.model.__table__))
+    if expected:
+        db.session.execute(insert(tally.model.__table__), [
+            dict(zip(key_columns, key), count=count) for key, count in expected.items()
+        ])
+    db.session.commit()
+    return len(expected)
+
+def ensure_counters():
+    """Build the counts for a database that predates them"""
+    for tally in TALLIES:
+        if tally.model.query.first() is None:
+            rebuild_counters(tally)
+
+counters_cli = AppGroup('counters', help='Maintain the dashboard counters and analytics rollups.')
+
+def _format_key(key):
+    return '/'.join(value.isoformat() if isinstance(value, date) else (value or 'NULL') for value in key)
+
+@counters_cli.command('verify')
+def verify_counters_command():
+    """Compare the counts with the tables and list any drift"""
+    drifted = 0
+    for tally in TALLIES:
+        drift = counter_drift(tally)
+        for key, (stored, actual) in sorted(drift.items()):
+            click.echo(f'{tally.name} {_format_key(key)}: stored {stored}, actual {actual}')
+        drifted += len(drift)
+    if drifted:
+        raise click.ClickException(f'{drifted} counts have drifted; run "flask counters rebuild"')
+    click.echo('Counts match the tables')
+
+@counters_cli.command('rebuild')
+def rebuild_counters_command():
+    """Recount every tally from the tables"""
+    for tally in TALLIES:
+        click.echo(f'Rebuilt {rebuild_counters(tally)} {tally.name}')
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from counters import ALL_SCOPE, scope_counts, user_scope
+from changes import on_commit
+from etags import request_table_versions
+
+DASHBOARD_CACHE_SIZE = 1000
+DASHBOARD_CACHE_TTL_SECONDS = 60
+# Tables each dashboard scope reads; member dashboards have no RCA section
+DASHBOARD_TABLES = {
+    ALL_SCOPE: frozenset(['tasks', 'deployments', 'incidents', 'rca', 'assets']),
+    'member': frozenset(['tasks', 'deployments', 'incidents', 'assets'])
+}
+
+def breakdown(counts, keys):
+    """Dashboard section with a total and one count per key"""
+    section = {'total': sum(counts.values())}
+    for key in keys:
+        section[key] = counts.get(key, 0)
+    return section
+
+def dashboard_data(role, user_id):
+    """Dashboard counts for a caller, read from the status counters in one query.
+
+    Members get their own records only; everyone else sees all records plus
+    the RCA section and the asset breakdown by type.
+    """
+    data = {}
+
+    if role == 'member':
+        # Member dashboard - only their data
+        counts = scope_counts(user_scope(user_id))
+        data['tasks'] = breakdown(counts.get(('tasks', 'status'), {}), ['pending', 'completed', 'overdue'])
+        data['deployments'] = breakdown(counts.get(('deployments', 'status'), {}), ['successful', 'pending', 'failed'])
+        data['incidents'] = breakdown(counts.get(('incidents', 'status'), {}), ['open', 'resolved'])
+        data['assets'] = breakdown(counts.get(('assets', 'asset_type'), {}), [])
+    else:
+        # Manager/Supervisor dashboard - all data
+        counts = scope_counts(ALL_SCOPE)
+        data['tasks'] = breakdown(counts.get(('tasks', 'status'), {}), ['pending', 'completed', 'overdue'])
+        data['deployments'] = breakdown(counts.get(('deployments', 'status'), {}), ['successful', 'pending', 'failed'])
+        data['incidents'] = breakdown(
+            counts.get(('incidents', 'status'), {}), ['open', 'investigating', 'resolved', 'closed']
+        )
+        data['rca'] = breakdown(counts.get(('rca', 'status'), {}), ['draft', 'approved', 'implemented'])
+
+        # The per-type counts also give the asset total
+        asset_counts = counts.get(('assets', 'asset_type'), {})
+        data['assets'] = breakdown(asset_counts, [])
+        data['assets']['by_type'] = {
+            asset_type: count for asset_type, count in asset_counts.items() if asset_type
+        }
+
+    return data
+
+def dashboard_scope(role, user_id):
+    """Managers and supervisors share one dashboard; members each get their own"""
+    return user_scope(user_id) if role == 'member' else ALL_SCOPE
+
+class DashboardCache:
+    """Per-process LRU cache of dashboard payloads, one per visibility scope.
+
+    An entry is fresh while it is younger than the TTL, no commit in this
+    process has touched its tables, and the table versions it was built
+    from are still current. An out-of-date entry may still be served while
+    it is younger than max_staleness, so a burst of writes costs at most one
+    recompute per scope per max_staleness seconds. Every member has a scope
+    of their own, so the least recently used entries are evicted past
+    max_entries.
+    """
+
+    def __init__(self, max_entries=DASHBOARD_CACHE_SIZE, ttl=DASHBOARD_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, scope, versions, max_staleness=0):
+        """(data, stale) for scope, or None when it must be recomputed"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is not None:
+                data, entry_versions, built_at, invalidated = entry
+                age = now - built_at
+                if not invalidated and entry_versions == versions and age < self.ttl:
+                    self._entries.move_to_end(scope)
+                    self._hits += 1
+                    return data, False
+                if age < max_staleness:
+                    self._entries.move_to_end(scope)
+                    self._stale_hits += 1
+                    return data, True
+            self._misses += 1
+            return None
+
+    def put(self, scope, versions, data):
+        with self._lock:
+            self._entries[scope] = (data, versions, time.monotonic(), False)
+            self._entries.move_to_end(scope)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate_tables(self, table_names):
+        with self._lock:
+            for scope, entry in self._entries.items():
+                tables = DASHBOARD_TABLES[ALL_SCOPE if scope == ALL_SCOPE else 'member']
+                if not entry[3] and tables & table_names:
+                    self._entries[scope] = entry[:3] + (True,)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'stale_hits': self._stale_hits,
+                'misses': self._misses,
+                'evictions': self._evictions
+            }
+
+dashboard_cache = DashboardCache()
+
+@on_commit
+def _invalidate_dashboards(changes):
+    dashboard_cache.invalidate_tables({change.table_name for change in changes})
+
+def dashboard_cache_stats():
+    return dashboard_cache.stats()
+
+def cached_dashboard_data(role, user_id):
+    """dashboard_data served through the dashboard cache.
+
+    Returns (data, stale); stale data is at most DASHBOARD_MAX_STALENESS
+    seconds old. Must be called from a conditional_get view, whose table
+    versions validate the cached entries.
+    """
+    scope = dashboard_scope(role, user_id)
+    tables = DASHBOARD_TABLES[ALL_SCOPE if scope == ALL_SCOPE else 'member']
+    versions = tuple((name, version) for name, version in request_table_versions() or () if name in tables)
+
+    cached = dashboard_cache.get(scope, versions, current_app.config.get('DASHBOARD_MAX_STALENESS', 0))
+    if cached is not None:
+        return cached
+
+    data = dashboard_data(role, user_id)
+    dashboard_cache.put(scope, versions, data)
+    return data, False
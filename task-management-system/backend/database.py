@@ -1,5 +1,33 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
+from sqlalchemy import and_, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
 
 db = SQLAlchemy()
-bcrypt = Bcrypt()
\ No newline at end of file
+bcrypt = Bcrypt()
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+def add_to_row(connection, table, key, column, delta):
+    """Add delta to column of the row of table whose primary key is key ({column: value}).
+
+    A missing row is created holding delta. On SQLite and PostgreSQL this is
+    one INSERT ... ON CONFLICT DO UPDATE, so transactions creating the same
+    row at once both succeed instead of one failing on the primary key.
+    """
+    upsert_insert = UPSERT_INSERTS.get(connection.dialect.name)
+    if upsert_insert is not None:
+        statement = upsert_insert(table).values(**key, **{column: delta})
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=list(key), set_={column: table.c[column] + delta}
+        ))
+        return
+
+    result = connection.execute(
+        update(table)
+        .where(and_(*[table.c[name] == value for name, value in key.items()]))
+        .values(**{column: table.c[column] + delta})
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(**key, **{column: delta}))
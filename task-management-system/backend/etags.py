@@ -0,0 +1,54 @@
+import hashlib
+from functools import wraps
+from flask import g, request, make_response
+from flask_jwt_extended import get_jwt_identity
+from changes import get_table_versions
+
+def conditional_get(*models, vary=None):
+    """Serve a strong ETag for a GET view and answer If-None-Match with 304.
+
+    The tag is derived from the versions of the tables the view reads, the
+    caller and the full request URL, so it can be checked before the view
+    loads any rows. The users table is always included because role changes
+    alter what a caller is allowed to see. vary, if given, returns any other
+    text the response depends on. Must be applied below jwt_required.
+    """
+    table_names = sorted({'users'} | {model.__tablename__ for model in models})
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = get_table_versions(table_names)
+            # Views validate their own caches against the same snapshot
+            g.table_versions = versions
+            key = '|'.join([
+                str(get_jwt_identity()),
+                request.full_path,
+                request.headers.get('Accept', ''),
+                ','.join(f'{name}:{versions[name]}' for name in table_names),
+                vary() if vary else ''
+            ])
+            etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                # Views opt out with no-store, e.g. when serving deliberately stale data
+                if response.status_code != 200 or response.cache_control.no_store:
+                    return response
+
+            # Per-caller content: browsers may keep it but must revalidate
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def request_table_versions():
+    """The table versions conditional_get read for this request, as a hashable tuple.
+
+    None outside a conditional_get view.
+    """
+    versions = g.get('table_versions')
+    return tuple(sorted(versions.items())) if versions is not None else None
@@ -0,0 +1,21 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+def gevent_patched():
+    """Whether gevent has monkey-patched threading in this process"""
+    if 'gevent' not in sys.modules:
+        return False
+    from gevent import monkey
+    return monkey.is_module_patched('threading')
+
+def native_thread_pool(max_workers, thread_name_prefix):
+    """A pool of real OS threads, also under gevent monkey-patching.
+
+    Patched threads are greenlets on the worker's one event loop, so CPU-bound
+    work on them would stall every other request; gevent's own executor keeps
+    native threads and lets the waiting greenlet yield.
+    """
+    if gevent_patched():
+        from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+        return GeventThreadPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
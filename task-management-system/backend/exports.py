@@ -0,0 +1,440 @@
+import base64
+import csv
+import io
+from collections import namedtuple
+from datetime import date, datetime
+from sqlalchemy import Boolean, Date, DateTime, Enum, Float, Integer, Numeric, String, inspect, or_, type_coerce
+from sqlalchemy.orm import aliased
+from database import db
+from counters import ALL_SCOPE, COUNTED_MODELS, scope_counts, user_scope
+from streaming import ChunkSink
+from models import Task, Deployment, Incident, RCA, Asset
+
+EXPORT_CHUNK_SIZE = 1000
+# Rows per Arrow record batch and Parquet row group
+COLUMNAR_BATCH_SIZE = 10000
+
+# model, [(header, attribute or 'relationship.attribute')], and the filter
+# limiting a member to their own rows
+ExportSpec = namedtuple('ExportSpec', ['model', 'columns', 'member_filter'])
+
+EXPORTS = {
+    'tasks': ExportSpec(Task, [
+        ('ID', 'id'), ('Name', 'name'), ('Description', 'description'), ('Priority', 'priority'),
+        ('Status', 'status'), ('Due Date', 'due_date'), ('Created By', 'creator.username'),
+        ('Assigned To', 'assignee.username'), ('Created At', 'created_at')
+    ], lambda user_id: or_(Task.assigned_to == user_id, Task.created_by == user_id)),
+    'deployments': ExportSpec(Deployment, [
+        ('ID', 'id'), ('Name', 'name'), ('Description', 'description'), ('Status', 'status'),
+        ('Deployment Date', 'deployment_date'), ('Backup Location', 'backup_location'),
+        ('Deployed By', 'deployer.username'), ('Created At', 'created_at')
+    ], lambda user_id: Deployment.deployed_by == user_id),
+    'incidents': ExportSpec(Incident, [
+        ('ID', 'id'), ('Name', 'name'), ('Description', 'description'), ('Severity', 'severity'),
+        ('Status', 'status'), ('Incident Date', 'incident_date'), ('Resolved At', 'resolved_at'),
+        ('Created By', 'incident_creator.username'), ('Assigned To', 'assigned_user.username'),
+        ('Created At', 'created_at')
+    ], lambda user_id: or_(Incident.assigned_to == user_id, Incident.created_by == user_id)),
+    'rca': ExportSpec(RCA, [
+        ('ID', 'id'), ('Incident', 'incident.name'), ('Root Cause', 'root_cause'),
+        ('Corrective Actions', 'corrective_actions'), ('Preventive Actions', 'preventive_actions'),
+        ('Status', 'status'), ('Assigned To', 'rca_assignee.username'), ('Created At', 'created_at')
+    ], lambda user_id: RCA.assigned_to == user_id),
+    'assets': ExportSpec(Asset, [
+        ('ID', 'id'), ('Server Name', 'server_name'), ('Asset ID', 'asset_id'),
+        ('Serial Number', 'serial_number'), ('IP Address', 'ip_address'),
+        ('Operating System', 'operating_system'), ('Asset Type', 'asset_type'),
+        ('Owner', 'asset_owner.username'), ('Created At', 'created_at')
+    ], lambda user_id: Asset.owner_id == user_id),
+}
+
+def _as_stored(attribute):
+    """attribute read as stored, with enum columns as plain strings.
+
+    A row holding a value since dropped from its enum then still exports
+    instead of failing to load.
+    """
+    return type_coerce(attribute, String) if isinstance(attribute.type, Enum) else attribute
+
+def export_query(report_type, role, user_id, columns=None):
+    """Column query for an export, ordered by id and limited to what the caller may see.
+
+    Related values come from outer joins rather than loaded objects, so rows
+    are plain tuples in the order of columns (default: the spec's columns).
+    """
+    spec = EXPORTS[report_type]
+    model = spec.model
+    entities = []
+    joins = {}
+    for _, path in columns or spec.columns:
+        if '.' in path:
+            relationship, attribute = path.split('.')
+            if relationship not in joins:
+                joins[relationship] = aliased(getattr(model, relationship).property.mapper.class_)
+            entities.append(_as_stored(getattr(joins[relationship], attribute)))
+        else:
+            entities.append(_as_stored(getattr(model, path)))
+
+    query = db.session.query(*entities).select_from(model)
+    for relationship, target in joins.items():
+        query = query.outerjoin(getattr(model, relationship).of_type(target))
+    if role == 'member':
+        query = query.filter(spec.member_filter(user_id))
+    return query.order_by(model.id)
+
+def format_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def export_rows(query, chunk_size=EXPORT_CHUNK_SIZE):
+    """Formatted rows of an export query, fetched chunk_size at a time"""
+    for row in query.yield_per(chunk_size):
+        yield [format_cell(value) for value in row]
+
+# Narrower column sets that fit across an A4 page
+PDF_COLUMNS = {
+    'tasks': [
+        ('Name', 'name'), ('Priority', 'priority'), ('Status', 'status'), ('Due Date', 'due_date'),
+        ('Assigned To', 'assignee.username')
+    ],
+    'deployments': [
+        ('Name', 'name'), ('Status', 'status'), ('Deployment Date', 'deployment_date'),
+        ('Deployed By', 'deployer.username')
+    ],
+    'incidents': [
+        ('Name', 'name'), ('Severity', 'severity'), ('Status', 'status'), ('Incident Date', 'incident_date'),
+        ('Assigned To', 'assigned_user.username')
+    ],
+    'rca': [
+        ('Incident', 'incident.name'), ('Root Cause', 'root_cause'), ('Status', 'status'),
+        ('Assigned To', 'rca_assignee.username')
+    ],
+    'assets': [
+        ('Server Name', 'server_name'), ('Asset ID', 'asset_id'), ('Type', 'asset_type'),
+        ('IP Address', 'ip_address'), ('Owner', 'asset_owner.username')
+    ],
+}
+
+PDF_CELL_WIDTH = 30
+# Rows laid out per page table; PDF_ROW_HEIGHT points each fills a landscape A4 page
+PDF_PAGE_ROWS = 34
+PDF_ROW_HEIGHT = 14
+PDF_MARGIN = 36
+
+def export_scope(role, user_id):
+    """Visibility scope of an export: members export only their own rows"""
+    return user_scope(user_id) if role == 'member' else ALL_SCOPE
+
+def export_tables(report_type):
+    """Tables an export reads, whose versions identify its contents"""
+    model = EXPORTS[report_type].model
+    tables = {model.__tablename__}
+    for _, path in EXPORTS[report_type].columns:
+        if '.' in path:
+            relationship = getattr(model, path.split('.')[0]).property
+            tables.add(relationship.mapper.class_.__tablename__)
+    return sorted(tables)
+
+def count_rows(query):
+    return query.order_by(None).count()
+
+def pdf_cell(value):
+    if value is None:
+        return 'N/A'
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    value = str(value)
+    return value[:PDF_CELL_WIDTH] + '...' if len(value) > PDF_CELL_WIDTH else value
+
+def write_csv(path, report_type, role, user_id, progress, options=None):
+    """Write an export to path as CSV, calling progress(rows_done, rows_total) per chunk"""
+    query = export_query(report_type, role, user_id)
+    total = count_rows(query)
+    progress(0, total)
+    done = 0
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.writer(output)
+        writer.writerow([header for header, _ in EXPORTS[report_type].columns])
+        for row in export_rows(query):
+            writer.writerow(row)
+            done += 1
+            if done % EXPORT_CHUNK_SIZE == 0:
+                progress(done, total)
+    progress(done, total)
+
+class FlowableStream(list):
+    """Flowables for doc.build that are pulled from an iterator as they are laid out.
+
+    Platypus only reads and removes from the front of its flowable list, so
+    refilling it one item at a time keeps just the page being built in memory.
+    """
+
+    def __init__(self, flowables):
+        super().__init__()
+        self._source = iter(flowables)
+
+    def __len__(self):
+        if not super().__len__():
+            for flowable in self._source:
+                self.append(flowable)
+                break
+        return super().__len__()
+
+def pdf_summary(report_type, scope, include_charts):
+    """Flowables summarising the report's counted columns, from the status counters"""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Image, Paragraph, Spacer, Table, TableStyle
+    from charts import create_chart
+
+    styles = getSampleStyleSheet()
+    counts = scope_counts(scope)
+    counted_columns = COUNTED_MODELS[EXPORTS[report_type].model][0]
+    table_name = EXPORTS[report_type].model.__tablename__
+    for column in counted_columns:
+        column_counts = counts.get((table_name, column), {})
+        if not column_counts:
+            continue
+        label = column.replace('_', ' ').title()
+        yield Paragraph(f'By {label}', styles['Heading2'])
+        rows = [[label, 'Count']] + [
+            [value or 'N/A', count] for value, count in sorted(column_counts.items(), key=lambda item: -item[1])
+        ]
+        summary = Table(rows, colWidths=[2.5 * inch, 1 * inch], hAlign='LEFT')
+        summary.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT')
+        ]))
+        yield summary
+        if include_charts:
+            chart = create_chart(
+                'pie', list(column_counts.values()), f'{report_type.title()} by {label}',
+                [value or 'N/A' for value in column_counts]
+            )
+            yield Image(io.BytesIO(base64.b64decode(chart)), width=5 * inch, height=3 * inch)
+        yield Spacer(1, 12)
+
+def write_pdf(path, report_type, role, user_id, progress, options=None):
+    """Write an export to path as a paginated PDF, calling progress(rows_done, rows_total) per page.
+
+    Rows are read from the export query and laid out PDF_PAGE_ROWS at a time
+    as separate tables with fixed column widths, each repeating the header
+    if it splits, so memory stays bounded and build time grows linearly with
+    the number of rows. options may turn off the per-column summaries
+    ('summary') and turn on their charts ('charts').
+    """
+    # Heavy: imported on first export so workers boot without it
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    options = options or {}
+    columns = PDF_COLUMNS[report_type]
+    header = [header for header, _ in columns]
+    query = export_query(report_type, role, user_id, columns)
+    total = count_rows(query)
+    progress(0, total)
+
+    doc = SimpleDocTemplate(
+        path, pagesize=landscape(A4), leftMargin=PDF_MARGIN, rightMargin=PDF_MARGIN,
+        topMargin=PDF_MARGIN, bottomMargin=PDF_MARGIN
+    )
+    column_widths = [doc.width / len(columns)] * len(columns)
+    # One style for every page table: its cost does not grow with the report
+    page_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=30,
+    )
+
+    def page_table(rows):
+        return Table(
+            [header] + rows, colWidths=column_widths, rowHeights=PDF_ROW_HEIGHT, repeatRows=1, style=page_style
+        )
+
+    def flowables():
+        title = f"{report_type.title()} Report - Generated on {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        yield Paragraph(title, title_style)
+        yield Paragraph(f'{total} records', styles['Normal'])
+        yield Spacer(1, 12)
+        if options.get('summary', True):
+            yield from pdf_summary(report_type, export_scope(role, user_id), options.get('charts', False))
+
+        rows = []
+        done = 0
+        for row in query.yield_per(EXPORT_CHUNK_SIZE):
+            rows.append([pdf_cell(value) for value in row])
+            if len(rows) == PDF_PAGE_ROWS:
+                done += len(rows)
+                yield page_table(rows)
+                progress(done, total)
+                rows = []
+        if rows or not done:
+            yield page_table(rows)
+
+    doc.build(FlowableStream(flowables()))
+    progress(total, total)
+
+def columnar_columns(report_type):
+    """Every column of the exported model plus the related names of its spec.
+
+    Related names are called after their path, e.g. creator_username.
+    """
+    spec = EXPORTS[report_type]
+    columns = [(attribute.key, attribute.key) for attribute in inspect(spec.model).column_attrs]
+    columns += [(path.replace('.', '_'), path) for _, path in spec.columns if '.' in path]
+    return columns
+
+def _column_of(model, path):
+    if '.' in path:
+        relationship, path = path.split('.')
+        model = getattr(model, relationship).property.mapper.class_
+    return inspect(model).columns[path]
+
+def arrow_type(column):
+    """Arrow type keeping the meaning of a SQLAlchemy column's type"""
+    import pyarrow as pa
+
+    column_type = column.type
+    if isinstance(column_type, Enum):
+        # A fixed dictionary: every batch shares it, and readers get a categorical
+        return pa.dictionary(pa.int32(), pa.string())
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, Numeric):
+        return pa.decimal128(column_type.precision or 38, column_type.scale or 0)
+    if isinstance(column_type, DateTime):
+        return pa.timestamp('us')
+    if isinstance(column_type, Date):
+        return pa.date32()
+    return pa.string()
+
+def columnar_schema(report_type):
+    """(columns, arrow schema, {column name: enum values}) of a columnar export"""
+    import pyarrow as pa
+
+    model = EXPORTS[report_type].model
+    columns = columnar_columns(report_type)
+    fields = []
+    enums = {}
+    for name, path in columns:
+        column = _column_of(model, path)
+        fields.append(pa.field(name, arrow_type(column)))
+        if isinstance(column.type, Enum):
+            enums[name] = list(column.type.enums)
+    return columns, pa.schema(fields), enums
+
+def record_batches(query, schema, enums, batch_size=COLUMNAR_BATCH_SIZE):
+    """Arrow record batches of batch_size rows built straight from the query's rows.
+
+    Enum values outside the declared ones (rows older than the enum) are null,
+    since the dictionary is fixed for the whole file.
+    """
+    import pyarrow as pa
+
+    dictionaries = {name: pa.array(values, pa.string()) for name, values in enums.items()}
+    indexes = {name: {value: index for index, value in enumerate(values)} for name, values in enums.items()}
+
+    def batch(rows):
+        arrays = []
+        for field, values in zip(schema, zip(*rows)):
+            if field.name in dictionaries:
+                index = indexes[field.name]
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array([index.get(value) for value in values], pa.int32()),
+                    dictionaries[field.name]
+                ))
+            else:
+                arrays.append(pa.array(values, field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    rows = []
+    for row in query.yield_per(batch_size):
+        rows.append(row)
+        if len(rows) == batch_size:
+            yield batch(rows)
+            rows = []
+    if rows:
+        yield batch(rows)
+
+def write_columnar(sink, export_format, query, schema, enums):
+    """Write query's rows to sink as Parquet or an Arrow IPC file, one record batch at a time.
+
+    Yields the rows written so far after each batch and once more after the
+    file's footer is written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if export_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+    done = 0
+    with writer:
+        for batch in record_batches(query, schema, enums):
+            writer.write_batch(batch)
+            done += batch.num_rows
+            yield done
+    yield done
+
+def columnar_query(report_type, role, user_id):
+    """(query, schema, enums) of a columnar export"""
+    columns, schema, enums = columnar_schema(report_type)
+    return export_query(report_type, role, user_id, columns), schema, enums
+
+def columnar_chunks(export_format, query, schema, enums):
+    """Bytes of a columnar export, one chunk per record batch"""
+    sink = ChunkSink()
+    for _ in write_columnar(sink, export_format, query, schema, enums):
+        data = sink.drain()
+        if data:
+            yield data
+
+def columnar_file_writer(export_format):
+    """Job writer producing a columnar export in export_format"""
+    def write(path, report_type, role, user_id, progress, options=None):
+        query, schema, enums = columnar_query(report_type, role, user_id)
+        total = count_rows(query)
+        progress(0, total)
+        with open(path, 'wb') as output:
+            for done in write_columnar(output, export_format, query, schema, enums):
+                progress(done, total)
+    return write
+
+COLUMNAR_MIMETYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+
+# format -> (writer, file extension, mimetype)
+EXPORT_FORMATS = {
+    'csv': (write_csv, 'csv', 'text/csv'),
+    'pdf': (write_pdf, 'pdf', 'application/pdf'),
+    'parquet': (columnar_file_writer('parquet'), 'parquet', COLUMNAR_MIMETYPES['parquet']),
+    'arrow': (columnar_file_writer('arrow'), 'arrow', COLUMNAR_MIMETYPES['arrow']),
+}
@@ -0,0 +1,44 @@
+from flask import request
+from sqlalchemy.orm import load_only, selectinload
+from models import with_serialized_relationships
+
+def get_requested_fields(model):
+    """Parse ?fields=a,b,c into a list of serialized keys, or None for all of them.
+
+    The id is always included so clients can still key and page the rows.
+    """
+    raw = request.args.get('fields', '').strip()
+    if not raw:
+        return None
+
+    fields = []
+    for field in raw.split(','):
+        field = field.strip()
+        if field and field not in fields:
+            fields.append(field)
+
+    unknown = [field for field in fields if field not in model.SERIALIZED_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return fields
+
+def with_fields(query, model, fields):
+    """Load only the columns and relationships needed to serialize fields"""
+    if fields is None:
+        return with_serialized_relationships(query, model)
+
+    relationships = getattr(model, 'FIELD_RELATIONSHIPS', {})
+    columns = []
+    options = []
+    for field in fields:
+        if field in relationships:
+            column, relationship = relationships[field]
+            columns.append(getattr(model, column))
+            options.append(selectinload(getattr(model, relationship)))
+        else:
+            columns.append(getattr(model, field))
+
+    return query.options(load_only(*columns), *options)
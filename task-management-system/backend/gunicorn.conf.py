@@ -0,0 +1,12 @@
+import os
+
+# gevent workers, so idle /api/events streams don't hold a thread each
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+worker_class = 'gevent'
+
+def post_fork(server, worker):
+    # psycopg2 waits in C and would block every greenlet in the worker;
+    # this makes its queries yield to the event loop instead
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
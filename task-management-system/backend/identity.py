@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from flask import jsonify
+from sqlalchemy import event, inspect
+from database import db
+from models import User
+from changes import on_commit
+
+# The parts of a user the authorization checks need, safe to share across requests
+Identity = namedtuple('Identity', ['id', 'username', 'role', 'is_active'])
+
+IDENTITY_TTL_SECONDS = 30
+# How often each worker pulls auth_version changes made by other workers
+REVOCATION_REFRESH_SECONDS = 5
+
+class IdentityCache:
+    """Short-lived per-process cache of Identity snapshots keyed by user id.
+
+    Entries are evicted as soon as a users row commits in this process; the
+    TTL bounds how long other workers can serve a stale role or status.
+    """
+
+    def __init__(self, ttl=IDENTITY_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[1] > now:
+                return entry[0]
+
+        user = User.query.get(user_id)
+        if user is None:
+            return None
+        identity = Identity(user.id, user.username, user.role, user.is_active)
+
+        with self._lock:
+            if len(self._entries) > 10000:
+                self._entries = {key: value for key, value in self._entries.items() if value[1] > now}
+            self._entries[user_id] = (identity, now + self.ttl)
+        return identity
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RevocationList:
+    """Per-process map of user id -> current auth_version.
+
+    Loaded once, then topped up every few seconds with users updated since
+    the last refresh, so checking a token normally costs no query at all.
+    """
+
+    def __init__(self, refresh_seconds=REVOCATION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._synced_at = None
+        self._next_refresh = 0
+
+    def mark_stale(self):
+        self._next_refresh = 0
+
+    def _refresh(self):
+        started_at = datetime.utcnow()
+        query = db.session.query(User.id, User.auth_version).filter(User.auth_version > 0)
+        if self._synced_at is not None:
+            # Overlap so rows committed while the last refresh ran are not missed
+            query = query.filter(User.updated_at > self._synced_at - timedelta(seconds=self.refresh_seconds))
+        rows = query.all()
+        with self._lock:
+            self._versions.update(rows)
+            self._synced_at = started_at
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+
+    def current_version(self, user_id):
+        if time.monotonic() >= self._next_refresh:
+            self._refresh()
+        return self._versions.get(user_id, 0)
+
+identity_cache = IdentityCache()
+revocation_list = RevocationList()
+
+@on_commit
+def _invalidate_changed_users(changes):
+    for change in changes:
+        if change.table_name == 'users':
+            identity_cache.invalidate(change.record_id)
+            revocation_list.mark_stale()
+
+@event.listens_for(User, 'before_update')
+def _bump_auth_version(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.role.history.has_changes() or state.attrs.is_active.history.has_changes():
+        target.auth_version = (target.auth_version or 0) + 1
+
+def identity_claims(user):
+    """Claims embedded in access tokens so requests can be authorized without a lookup"""
+    return {
+        'username': user.username,
+        'role': user.role,
+        'active': user.is_active,
+        'av': user.auth_version or 0
+    }
+
+def init_identity(jwt):
+    """Resolve flask_jwt_extended's current_user from token claims"""
+
+    @jwt.token_in_blocklist_loader
+    def token_revoked(_jwt_header, jwt_data):
+        return jwt_data.get('av', 0) < revocation_list.current_version(jwt_data['sub'])
+
+    @jwt.revoked_token_loader
+    def revoked_token(_jwt_header, jwt_data):
+        return jsonify({'error': 'Your access has changed, please log in again'}), 401
+
+    @jwt.user_lookup_loader
+    def load_current_user(_jwt_header, jwt_data):
+        if 'role' in jwt_data:
+            identity = Identity(jwt_data['sub'], jwt_data['username'], jwt_data['role'], jwt_data['active'])
+        else:
+            # Tokens issued before role claims existed
+            identity = identity_cache.get(jwt_data['sub'])
+        # Returning None makes jwt_required reject the request
+        if identity is None or not identity.is_active:
+            return None
+        return identity
+
+    @jwt.user_lookup_error_loader
+    def current_user_rejected(_jwt_header, jwt_data):
+        return jsonify({'error': 'Account is deactivated or no longer exists'}), 401
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from changes import get_table_versions
+from exports import EXPORT_FORMATS, export_scope, export_tables
+
+DEFAULT_EXPORT_WORKERS = 2
+DEFAULT_EXPORT_TTL_SECONDS = 3600
+# Unfinished jobs re-save their state this often; one silent for JOB_STALL_SECONDS lost its worker
+JOB_HEARTBEAT_SECONDS = 30
+JOB_STALL_SECONDS = 300
+CLEANUP_INTERVAL_SECONDS = 60
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+def default_export_dir():
+    return os.path.join(tempfile.gettempdir(), 'task-management-exports')
+
+def _process_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class ExportJobs:
+    """Runs exports on a thread pool and keeps their files on local disk.
+
+    Each job's state lives in a JSON file next to its artifact, so any worker
+    process sharing the directory can report on it or serve the download.
+    Identical requests (same format, report type, options, scope and table
+    versions) share one job through a key file claimed with an atomic link, which also
+    deduplicates across processes. An unfinished job is given up when its
+    heartbeat stops, and a queued one as soon as the process that queued it
+    has exited. Finished jobs expire ttl seconds after they finish and are
+    swept by cleanup.
+    """
+
+    def __init__(self, directory, ttl=DEFAULT_EXPORT_TTL_SECONDS, workers=DEFAULT_EXPORT_WORKERS):
+        self.directory = directory
+        self.ttl = ttl
+        self.workers = workers
+        os.makedirs(directory, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export')
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._unfinished = {}
+        self._last_cleanup = 0
+        self._submitted = 0
+        self._deduplicated = 0
+        threading.Thread(target=self._heartbeat, name='export-heartbeat', daemon=True).start()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _save(self, job):
+        with self._save_lock:
+            job['updated_at'] = time.time()
+            partial = self._path(f"{job['id']}.json.tmp")
+            with open(partial, 'w') as output:
+                json.dump(job, output)
+            os.replace(partial, self._path(f"{job['id']}.json"))
+
+    def _heartbeat(self):
+        """Re-save unfinished jobs so a long wait or query is not taken for a dead worker"""
+        while True:
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+            with self._lock:
+                jobs = list(self._unfinished.values())
+            for job in jobs:
+                self._save(job)
+
+    @staticmethod
+    def _stalled(job, now):
+        if job['status'] not in ('queued', 'running'):
+            return False
+        if job['status'] == 'queued' and not _process_alive(job.get('pid')):
+            return True
+        # Also covers a queued job whose pid was reused by another process
+        return now - job['updated_at'] > JOB_STALL_SECONDS
+
+    def _load(self, job_id):
+        try:
+            with open(self._path(f'{job_id}.json')) as source:
+                job = json.load(source)
+        except (FileNotFoundError, ValueError):
+            return None
+        now = time.time()
+        if self._stalled(job, now):
+            job['status'] = 'failed'
+            job['error'] = 'Export worker stopped before finishing'
+        if job.get('expires_at') is not None and job['expires_at'] <= now:
+            return None
+        return job
+
+    def get(self, job_id):
+        """Job state for job_id, or None if it is unknown or expired"""
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        return self._load(job_id)
+
+    def artifact_path(self, job):
+        return self._path(f"{job['id']}.{job['extension']}")
+
+    def _claim(self, key_name, job_id):
+        """Point key_name at job_id unless another job already holds it"""
+        staged = self._path(f'{job_id}.key.tmp')
+        with open(staged, 'w') as output:
+            output.write(job_id)
+        try:
+            os.link(staged, self._path(key_name))
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(staged)
+
+    def _holder(self, key_name):
+        try:
+            with open(self._path(key_name)) as source:
+                return source.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def submit(self, export_format, report_type, role, user_id, options=None):
+        """Queue an export, or return the live job already producing the same file"""
+        self.cleanup()
+        scope = export_scope(role, user_id)
+        tables = export_tables(report_type)
+        versions = sorted(get_table_versions(tables).items())
+        key = json.dumps([export_format, report_type, scope, versions, options or {}], sort_keys=True)
+        key_name = hashlib.sha256(key.encode('utf-8')).hexdigest() + '.key'
+
+        job_id = uuid.uuid4().hex
+        writer, extension, mimetype = EXPORT_FORMATS[export_format]
+        job = {
+            'id': job_id,
+            'format': export_format,
+            'type': report_type,
+            'scope': scope,
+            'options': options or {},
+            'key': key_name,
+            'status': 'queued',
+            'pid': os.getpid(),
+            'rows_done': 0,
+            'rows_total': None,
+            'error': None,
+            'extension': extension,
+            'mimetype': mimetype,
+            'filename': f'{report_type}_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}',
+            'created_at': time.time(),
+            'finished_at': None,
+            'expires_at': None
+        }
+
+        with self._lock:
+            # Two rounds: a dead job's key is released and claimed once more
+            for _ in range(2):
+                holder = self._holder(key_name)
+                existing = self._load(holder) if holder else None
+                if existing is not None and existing['status'] != 'failed':
+                    self._deduplicated += 1
+                    return existing
+                if holder:
+                    self._release(key_name, holder)
+                self._save(job)
+                if self._claim(key_name, job_id):
+                    self._unfinished[job_id] = job
+                    break
+                os.remove(self._path(f'{job_id}.json'))
+            else:
+                raise RuntimeError('Could not queue the export')
+            self._submitted += 1
+
+        app = current_app._get_current_object()
+        self._pool.submit(self._run, app, job, writer, role, user_id)
+        return job
+
+    def _release(self, key_name, job_id):
+        if self._holder(key_name) == job_id:
+            try:
+                os.remove(self._path(key_name))
+            except FileNotFoundError:
+                pass
+
+    def _run(self, app, job, writer, role, user_id):
+        partial = self.artifact_path(job) + '.partial'
+
+        def progress(rows_done, rows_total):
+            job['rows_done'] = rows_done
+            job['rows_total'] = rows_total
+            self._save(job)
+
+        try:
+            with app.app_context():
+                job['status'] = 'running'
+                self._save(job)
+                writer(partial, job['type'], role, user_id, progress, job['options'])
+            os.replace(partial, self.artifact_path(job))
+            job['status'] = 'done'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            self._release(job['key'], job['id'])
+            if os.path.exists(partial):
+                os.remove(partial)
+        with self._lock:
+            self._unfinished.pop(job['id'], None)
+        job['finished_at'] = time.time()
+        job['expires_at'] = job['finished_at'] + self.ttl
+        self._save(job)
+
+    def _remove(self, job):
+        for name in (f"{job['id']}.json", f"{job['id']}.{job['extension']}"):
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+        self._release(job['key'], job['id'])
+
+    def cleanup(self, force=False):
+        """Delete expired jobs and their files; runs at most once a minute unless forced"""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_cleanup < CLEANUP_INTERVAL_SECONDS:
+                return 0
+            self._last_cleanup = now
+
+        removed = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(self._path(name)) as source:
+                    job = json.load(source)
+            except (FileNotFoundError, ValueError):
+                continue
+            expires_at = job.get('expires_at')
+            if expires_at is None:
+                if not self._stalled(job, now):
+                    continue
+                # Never finished: its worker died; give it the same lifetime
+                expires_at = job['updated_at'] + JOB_STALL_SECONDS + self.ttl
+            if expires_at <= now:
+                self._remove(job)
+                removed += 1
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'ttl_seconds': self.ttl,
+                'submitted': self._submitted,
+                'deduplicated': self._deduplicated
+            }
+
+_jobs = None
+_jobs_lock = threading.Lock()
+
+def get_export_jobs():
+    global _jobs
+    if _jobs is None:
+        with _jobs_lock:
+            if _jobs is None:
+                _jobs = ExportJobs(
+                    current_app.config.get('EXPORT_DIR') or default_export_dir(),
+                    current_app.config.get('EXPORT_TTL_SECONDS', DEFAULT_EXPORT_TTL_SECONDS),
+                    current_app.config.get('EXPORT_JOB_WORKERS', DEFAULT_EXPORT_WORKERS)
+                )
+    return _jobs
+
+def export_job_stats():
+    return _jobs.stats() if _jobs is not None else None
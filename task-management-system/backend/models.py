@@ -1,7 +1,9 @@
 from datetime import datetime
 from decimal import Decimal
-from database import db, bcrypt
-from sqlalchemy import Numeric
+from database import db
+from passwords import hash_password, verify_password
+from sqlalchemy import Numeric, or_
+from sqlalchemy.orm import selectinload
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -14,7 +16,10 @@ class User(db.Model):
     first_name = db.Column(db.String(50))
     last_name = db.Column(db.String(50))
     is_active = db.Column(db.Boolean, default=True)
+    # Bumped when role or is_active change; tokens carrying an older value are revoked
+    auth_version = db.Column(db.Integer, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     
     # Relationships
@@ -27,10 +32,10 @@ class User(db.Model):
     assets = db.relationship('Asset', backref='asset_owner', lazy='dynamic')
     
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     def to_dict(self):
         return {
@@ -41,7 +46,8 @@ class User(db.Model):
             'first_name': self.first_name,
             'last_name': self.last_name,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
 class Task(db.Model):
@@ -55,6 +61,7 @@ class Task(db.Model):
     due_date = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'))
     
@@ -68,6 +75,7 @@ class Task(db.Model):
             'due_date': self.due_date.isoformat() if self.due_date else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
             'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'created_by': self.creator.username if self.creator else None,
             'assigned_to': self.assignee.username if self.assignee else None
         }
@@ -83,6 +91,7 @@ class Deployment(db.Model):
     backup_location = db.Column(db.String(500))
     deployed_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     def to_dict(self):
         return {
@@ -93,7 +102,8 @@ class Deployment(db.Model):
             'deployment_date': self.deployment_date.isoformat(),
             'backup_location': self.backup_location,
             'deployed_by': self.deployer.username if self.deployer else None,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
 class Incident(db.Model):
@@ -107,6 +117,7 @@ class Incident(db.Model):
     incident_date = db.Column(db.DateTime, default=datetime.utcnow)
     resolved_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'))
     
@@ -120,6 +131,7 @@ class Incident(db.Model):
             'incident_date': self.incident_date.isoformat(),
             'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None,
             'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'created_by': self.incident_creator.username if self.incident_creator else None,
             'assigned_to': self.assigned_user.username if self.assigned_user else None
         }
@@ -134,6 +146,7 @@ class RCA(db.Model):
     preventive_actions = db.Column(db.Text)
     status = db.Column(db.Enum('draft', 'under_review', 'approved', 'implemented', name='rca_status'), default='draft')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'))
     
     incident = db.relationship('Incident', backref='rca_analysis')
@@ -148,6 +161,7 @@ class RCA(db.Model):
             'preventive_actions': self.preventive_actions,
             'status': self.status,
             'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'assigned_to': self.rca_assignee.username if self.rca_assignee else None
         }
 
@@ -157,11 +171,11 @@ class Asset(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     server_name = db.Column(db.String(100), nullable=False)
     asset_id = db.Column(db.String(50), unique=True, nullable=False)
-    serial_number = db.Column(db.String(50))
-    ip_address = db.Column(db.String(15))
+    serial_number = db.Column(db.String(50), index=True)
+    ip_address = db.Column(db.String(45), index=True)
     rack_number = db.Column(db.String(20))
     slot_number = db.Column(db.String(20))
-    host_name = db.Column(db.String(100))
+    host_name = db.Column(db.String(100), index=True)
     operating_system = db.Column(db.String(100))
     service_packs = db.Column(db.Text)
     software_details = db.Column(db.Text)
@@ -188,9 +202,28 @@ class Asset(db.Model):
     custodian = db.Column(db.String(100))
     users = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
-    def to_dict(self):
+    # Keys emitted by to_dict, selectable through ?fields=
+    SERIALIZED_FIELDS = (
+        'id', 'server_name', 'asset_id', 'serial_number', 'ip_address', 'rack_number',
+        'slot_number', 'host_name', 'operating_system', 'service_packs', 'software_details',
+        'business_requirements', 'technical_contact', 'vendor', 'make_model', 'cpu', 'ram',
+        'hdd', 'purpose', 'asset_type', 'dependency', 'redundancy_requirements',
+        'stored_information', 'backup_schedule', 'confidentiality_req', 'integrity_req',
+        'availability_req', 'asset_value', 'asset_value_rating', 'classification', 'owner',
+        'custodian', 'users', 'created_at', 'updated_at'
+    )
+    
+    # Serialized keys backed by a relationship: key -> (foreign key column, relationship)
+    FIELD_RELATIONSHIPS = {
+        'owner': ('owner_id', 'asset_owner')
+    }
+    
+    def to_dict(self, fields=None):
+        if fields is not None:
+            return {field: self._serialize_field(field) for field in fields}
+        
         return {
             'id': self.id,
             'server_name': self.server_name,
@@ -227,4 +260,77 @@ class Asset(db.Model):
             'users': self.users,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
-        }
\ No newline at end of file
+        }
+    
+    def _serialize_field(self, field):
+        if field == 'owner':
+            return self.asset_owner.username if self.asset_owner else None
+        value = getattr(self, field)
+        if field == 'asset_value':
+            return float(value) if value else None
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+    
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class StatusCounter(db.Model):
+    __tablename__ = 'status_counters'
+    
+    table_name = db.Column(db.String(50), primary_key=True)
+    column_name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(50), primary_key=True)  # '' when the column is NULL
+    scope = db.Column(db.String(30), primary_key=True)  # 'all' or 'user:<id>'
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class DailyRollup(db.Model):
+    __tablename__ = 'daily_rollups'
+    
+    metric = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    value = db.Column(db.String(50), primary_key=True)  # '' when not broken down or NULL
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class Tombstone(db.Model):
+    __tablename__ = 'tombstones'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    record_id = db.Column(db.Integer, nullable=False)
+    scope_user_id = db.Column(db.Integer)
+    alt_scope_user_id = db.Column(db.Integer)
+    # 'deleted', or 'left_scope' when the row moved out of a member's scope
+    kind = db.Column(db.String(10), nullable=False, default='deleted')
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+# Columns that make a row visible to a member: the row is theirs if any matches
+MEMBER_SCOPE_COLUMNS = {
+    User: ('id',),
+    Task: ('assigned_to',),
+    Deployment: ('deployed_by',),
+    Incident: ('assigned_to', 'created_by'),
+    RCA: ('assigned_to',),
+    Asset: ('owner_id',),
+}
+
+def member_scope_filter(model, user_id):
+    """Filter matching the rows of model a member is allowed to see"""
+    return or_(*[getattr(model, column) == user_id for column in MEMBER_SCOPE_COLUMNS[model]])
+
+# Relationships read by each model's to_dict
+SERIALIZED_RELATIONSHIPS = {
+    Task: ('creator', 'assignee'),
+    Deployment: ('deployer',),
+    Incident: ('incident_creator', 'assigned_user'),
+    RCA: ('incident', 'rca_assignee'),
+    Asset: ('asset_owner',),
+}
+
+def with_serialized_relationships(query, model):
+    """Batch-load the relationships to_dict touches, one IN query per relationship"""
+    names = SERIALIZED_RELATIONSHIPS.get(model, ())
+    return query.options(*[selectinload(getattr(model, name)) for name in names])
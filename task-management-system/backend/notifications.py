@@ -0,0 +1,197 @@
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from changes import on_commit
+
+logger = logging.getLogger(__name__)
+
+# Tables pushed to subscribers and the entity name clients see for each
+NOTIFIED_TABLES = {
+    'tasks': 'task',
+    'incidents': 'incident',
+    'deployments': 'deployment',
+    'rca': 'rca',
+    'assets': 'asset'
+}
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# PostgreSQL channel every worker listens on; a NOTIFY payload must stay under 8000 bytes
+NOTIFY_CHANNEL = 'entity_changes'
+NOTIFY_BATCH_SIZE = 50
+LISTEN_POLL_SECONDS = 5
+LISTEN_RETRY_SECONDS = 2
+
+class Subscriber:
+    def __init__(self, user_id, member_scoped):
+        self.user_id = user_id
+        self.member_scoped = member_scoped
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Set when the client falls too far behind and must refetch instead
+        self.overflowed = False
+
+    def wants(self, scope_user_ids):
+        return not self.member_scoped or self.user_id in scope_user_ids
+
+def change_events(changes):
+    """(scope_user_ids, payload) for each change subscribers are told about"""
+    return [
+        (change.scope_user_ids, {
+            'type': NOTIFIED_TABLES[change.table_name],
+            'action': change.action,
+            'id': change.record_id
+        })
+        for change in changes if change.table_name in NOTIFIED_TABLES
+    ]
+
+class ChangeBroker:
+    """Fans committed changes out to connected event stream subscribers.
+
+    Publishing never blocks: a subscriber whose queue is full is flagged as
+    overflowed and told to resync, so one slow client cannot hold up writes.
+    With a relay attached, changes reach the broker through the database
+    instead of the committing process, so every worker sees every write.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self.relay = None
+
+    def subscribe(self, user_id, member_scoped):
+        subscriber = Subscriber(user_id, member_scoped)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        if self.relay is not None:
+            self.relay.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, changes):
+        """Deliver changes committed by this process, unless the relay carries them"""
+        if self.relay is None:
+            self.deliver(change_events(changes))
+
+    def deliver(self, events):
+        if not events:
+            return
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            for scope_user_ids, payload in events:
+                if subscriber.overflowed or not subscriber.wants(scope_user_ids):
+                    continue
+                try:
+                    subscriber.queue.put_nowait(payload)
+                except queue.Full:
+                    subscriber.overflowed = True
+
+    def resync_all(self):
+        """Tell every subscriber to refetch, after events may have been missed"""
+        with self._lock:
+            for subscriber in self._subscribers:
+                subscriber.overflowed = True
+
+class PostgresRelay:
+    """Carries changes between worker processes over PostgreSQL LISTEN/NOTIFY.
+
+    Writers queue a NOTIFY in the same transaction as their rows, so it is
+    sent only if they commit. Each process keeps one listening connection,
+    opened with its first subscriber, and hands what arrives to its broker.
+    """
+
+    def __init__(self, engine, broker):
+        self.engine = engine
+        self.broker = broker
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name='change-relay', daemon=True)
+                self._thread.start()
+
+    def _listen(self):
+        connected_before = False
+        while True:
+            connection = None
+            try:
+                connection = self.engine.raw_connection()
+                driver = connection.driver_connection
+                driver.autocommit = True
+                with driver.cursor() as cursor:
+                    cursor.execute(f'LISTEN {NOTIFY_CHANNEL}')
+                if connected_before:
+                    # Anything sent while we were disconnected is gone
+                    self.broker.resync_all()
+                connected_before = True
+                while True:
+                    if select.select([driver], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                        continue
+                    driver.poll()
+                    while driver.notifies:
+                        notify = driver.notifies.pop(0)
+                        self.broker.deliver([
+                            (frozenset(scope_user_ids), payload)
+                            for scope_user_ids, payload in json.loads(notify.payload)
+                        ])
+            except Exception:
+                logger.exception('Change relay lost its connection; reconnecting')
+                if connection is not None:
+                    connection.invalidate()
+                time.sleep(LISTEN_RETRY_SECONDS)
+
+def format_sse(data, event=None):
+    """Encode one Server-Sent Events message"""
+    message = f'data: {json.dumps(data)}\n\n'
+    if event:
+        message = f'event: {event}\n' + message
+    return message
+
+broker = ChangeBroker()
+on_commit(broker.publish)
+
+@event.listens_for(Session, 'after_flush')
+def _queue_change_notifications(session, flush_context):
+    """Send this flush's changes to the relay channel; PostgreSQL holds them until commit"""
+    if broker.relay is None:
+        return
+    changes = session.info.get('pending_changes', [])
+    sent = session.info.get('notified_changes', 0)
+    session.info['notified_changes'] = len(changes)
+    events = [
+        (sorted(scope_user_ids), payload)
+        for scope_user_ids, payload in change_events(changes[sent:])
+    ]
+    connection = session.connection()
+    for start in range(0, len(events), NOTIFY_BATCH_SIZE):
+        connection.execute(
+            text('SELECT pg_notify(:channel, :payload)'),
+            {'channel': NOTIFY_CHANNEL, 'payload': json.dumps(events[start:start + NOTIFY_BATCH_SIZE])}
+        )
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _reset_change_notifications(session):
+    session.info.pop('notified_changes', None)
+
+def init_notifications(app, db):
+    """Relay changes through the database when it can reach every worker"""
+    with app.app_context():
+        if db.engine.dialect.name == 'postgresql':
+            broker.relay = PostgresRelay(db.engine, broker)
@@ -0,0 +1,65 @@
+import base64
+import json
+from flask import request
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(last_id):
+    """Encode the id of the last row on a page as an opaque cursor"""
+    raw = json.dumps({'id': last_id}).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor back into a row id"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))['id']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(last_id, int):
+        raise ValueError('Invalid cursor')
+    return last_id
+
+def get_page_args():
+    """Read and validate ?limit=, ?cursor= and ?order= from the current request"""
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    cursor = request.args.get('cursor')
+    after_id = decode_cursor(cursor) if cursor else None
+
+    order = request.args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
+
+    return limit, after_id, order == 'desc'
+
+def paginate(query, model):
+    """Apply an id-seek page to query.
+
+    Rows are ordered by primary key (newest first with ?order=desc, which
+    later pages must repeat) and the page starts strictly after the id
+    carried in the cursor, so deep pages cost the same as the first one.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    limit, after_id, descending = get_page_args()
+
+    if after_id is not None:
+        query = query.filter(model.id < after_id if descending else model.id > after_id)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(model.id.desc() if descending else model.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+
+    return rows, next_cursor
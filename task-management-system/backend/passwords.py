@@ -0,0 +1,112 @@
+import os
+import threading
+import bcrypt as bcrypt_lib
+from flask import current_app
+from executors import native_thread_pool
+
+DEFAULT_LOG_ROUNDS = 12
+DEFAULT_POOL_SIZE = max(2, (os.cpu_count() or 2) // 2)
+# Requests allowed to wait for a slot, per worker, before new ones are turned away
+DEFAULT_MAX_PENDING = 64
+
+class PasswordPoolBusy(Exception):
+    """Raised when too many password operations are already queued"""
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so capping the pool caps how many cores a login
+    storm can take; everything else keeps being served. Callers still wait
+    for their own result, but past max_pending queued jobs they are rejected
+    immediately instead of piling up.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, max_pending=DEFAULT_MAX_PENDING):
+        self.pool_size = pool_size
+        self.max_pending = max_pending
+        # Real OS threads even under gevent, so bcrypt never runs on the event loop
+        self._executor = native_thread_pool(pool_size, 'bcrypt')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PasswordPoolBusy('Too many password checks in progress, please retry')
+            self._pending += 1
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    def hash(self, password, rounds):
+        return self._run(_hash, password, rounds)
+
+    def verify(self, password_hash, password):
+        return self._run(_verify, password_hash, password)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pool_size': self.pool_size,
+                'pending': self._pending,
+                'max_pending': self.max_pending,
+                'completed': self._completed,
+                'rejected': self._rejected
+            }
+
+def _hash(password, rounds):
+    return bcrypt_lib.hashpw(password.encode('utf-8'), bcrypt_lib.gensalt(rounds)).decode('utf-8')
+
+def _verify(password_hash, password):
+    return bcrypt_lib.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+_hasher = None
+_hasher_lock = threading.Lock()
+_dummy_hashes = {}
+
+def get_hasher():
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(
+                    current_app.config.get('PASSWORD_HASH_WORKERS', DEFAULT_POOL_SIZE),
+                    current_app.config.get('PASSWORD_HASH_MAX_PENDING', DEFAULT_MAX_PENDING)
+                )
+    return _hasher
+
+def configured_rounds():
+    return current_app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
+
+def hash_password(password):
+    return get_hasher().hash(password, configured_rounds())
+
+def verify_password(password_hash, password):
+    """Check password against password_hash on the bcrypt pool.
+
+    With no hash (unknown username) a dummy hash of the configured cost is
+    checked instead, so the response takes as long as a real mismatch.
+    """
+    if password_hash is None:
+        rounds = configured_rounds()
+        if rounds not in _dummy_hashes:
+            _dummy_hashes[rounds] = get_hasher().hash('not-a-real-password', rounds)
+        get_hasher().verify(_dummy_hashes[rounds], password)
+        return False
+    return get_hasher().verify(password_hash, password)
+
+def needs_rehash(password_hash):
+    """True when password_hash was made with a different cost than configured"""
+    try:
+        return int(password_hash.split('$')[2]) != configured_rounds()
+    except (IndexError, ValueError):
+        return True
+
+def password_pool_stats():
+    return get_hasher().stats()
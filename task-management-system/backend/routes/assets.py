@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from database import db
-from models import Asset, User
+from models import Asset
+from etags import conditional_get
+from fieldsets import get_requested_fields, with_fields
+from pagination import paginate
+from streaming import wants_stream, stream_ndjson
 
 assets_bp = Blueprint('assets', __name__)
 
@@ -10,18 +14,35 @@ def check_permission(current_user_role, required_roles):
 
 @assets_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(Asset)
 def get_assets():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
+        
+        try:
+            fields = get_requested_fields(Asset)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Members can only see their owned assets
         if current_user.role == 'member':
-            assets = Asset.query.filter_by(owner_id=current_user_id).all()
+            query = Asset.query.filter_by(owner_id=current_user_id)
         else:
-            assets = Asset.query.all()
+            query = Asset.query
+        
+        query = with_fields(query, Asset, fields)
+        if wants_stream():
+            return stream_ndjson(query, Asset, serialize=lambda asset: asset.to_dict(fields))
+        
+        try:
+            assets, next_cursor = paginate(query, Asset)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify({'assets': [asset.to_dict() for asset in assets]}), 200
+        return jsonify({
+            'assets': [asset.to_dict(fields) for asset in assets],
+            'next_cursor': next_cursor
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -93,10 +114,10 @@ def create_asset():
 
 @assets_bp.route('/<int:asset_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(Asset)
 def get_asset(asset_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         asset = Asset.query.get(asset_id)
         if not asset:
@@ -116,7 +137,6 @@ def get_asset(asset_id):
 def update_asset(asset_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         asset = Asset.query.get(asset_id)
         if not asset:
@@ -174,7 +194,6 @@ def update_asset(asset_id):
 def delete_asset(asset_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         asset = Asset.query.get(asset_id)
         if not asset:
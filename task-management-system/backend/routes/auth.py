@@ -2,6 +2,9 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from database import db
 from models import User
+from identity import identity_claims
+from passwords import verify_password, needs_rehash, PasswordPoolBusy
+from etags import conditional_get
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
@@ -18,13 +21,27 @@ def login():
         
         user = User.query.filter_by(username=username).first()
         
-        if not user or not user.check_password(password):
+        # Unknown usernames are checked against a dummy hash so they take as long
+        try:
+            password_ok = verify_password(user.password_hash if user else None, password)
+        except PasswordPoolBusy as e:
+            return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+        
+        if not user or not password_ok:
             return jsonify({'error': 'Invalid credentials'}), 401
         
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
-        access_token = create_access_token(identity=user.id)
+        # Upgrade hashes made with an older bcrypt cost while we know the password
+        if needs_rehash(user.password_hash):
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except PasswordPoolBusy:
+                pass  # Upgraded on a later login instead
+        
+        access_token = create_access_token(identity=user.id, additional_claims=identity_claims(user))
         
         return jsonify({
             'access_token': access_token,
@@ -36,6 +53,7 @@ def login():
 
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
+@conditional_get()
 def get_current_user():
     try:
         current_user_id = get_jwt_identity()
@@ -77,5 +95,7 @@ def change_password():
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from database import db
-from models import Deployment, User
+from models import Deployment, with_serialized_relationships
+from etags import conditional_get
+from pagination import paginate
 from datetime import datetime
 
 deployments_bp = Blueprint('deployments', __name__)
@@ -11,18 +13,26 @@ def check_permission(current_user_role, required_roles):
 
 @deployments_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(Deployment)
 def get_deployments():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         # Members can only see their deployments
         if current_user.role == 'member':
-            deployments = Deployment.query.filter_by(deployed_by=current_user_id).all()
+            query = Deployment.query.filter_by(deployed_by=current_user_id)
         else:
-            deployments = Deployment.query.all()
+            query = Deployment.query
         
-        return jsonify({'deployments': [deployment.to_dict() for deployment in deployments]}), 200
+        try:
+            deployments, next_cursor = paginate(with_serialized_relationships(query, Deployment), Deployment)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'deployments': [deployment.to_dict() for deployment in deployments],
+            'next_cursor': next_cursor
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -69,10 +79,10 @@ def create_deployment():
 
 @deployments_bp.route('/<int:deployment_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(Deployment)
 def get_deployment(deployment_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         deployment = Deployment.query.get(deployment_id)
         if not deployment:
@@ -92,7 +102,6 @@ def get_deployment(deployment_id):
 def update_deployment(deployment_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         deployment = Deployment.query.get(deployment_id)
         if not deployment:
@@ -141,7 +150,6 @@ def update_deployment(deployment_id):
 def delete_deployment(deployment_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         deployment = Deployment.query.get(deployment_id)
         if not deployment:
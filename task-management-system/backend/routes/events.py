@@ -0,0 +1,43 @@
+from flask import Blueprint, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from database import db
+from notifications import broker, format_sse
+import queue
+
+events_bp = Blueprint('events', __name__)
+
+# Idle streams send a comment this often so proxies keep them open
+HEARTBEAT_SECONDS = 15
+
+@events_bp.route('/', methods=['GET'])
+# EventSource cannot send headers, so this stream alone also takes ?jwt=
+@jwt_required(locations=['headers', 'query_string'])
+def stream_events():
+    current_user_id = get_jwt_identity()
+    member_scoped = current_user.role == 'member'
+    
+    # Nothing below touches the database; give the connection back now
+    db.session.remove()
+    
+    subscriber = broker.subscribe(current_user_id, member_scoped)
+    
+    def generate():
+        try:
+            yield format_sse({'subscribed': True}, event='ready')
+            while True:
+                if subscriber.overflowed:
+                    yield format_sse({'reason': 'too many pending events'}, event='resync')
+                    return
+                try:
+                    payload = subscriber.queue.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_sse(payload, event='change')
+        finally:
+            broker.unsubscribe(subscriber)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
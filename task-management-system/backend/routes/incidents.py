@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from database import db
-from models import Incident, User
+from models import Incident, with_serialized_relationships
+from etags import conditional_get
+from pagination import paginate
+from streaming import wants_stream, stream_ndjson
 from datetime import datetime
 
 incidents_bp = Blueprint('incidents', __name__)
@@ -11,21 +14,33 @@ def check_permission(current_user_role, required_roles):
 
 @incidents_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(Incident)
 def get_incidents():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         # Members can only see their assigned or created incidents
         if current_user.role == 'member':
-            incidents = Incident.query.filter(
+            query = Incident.query.filter(
                 (Incident.assigned_to == current_user_id) | 
                 (Incident.created_by == current_user_id)
-            ).all()
+            )
         else:
-            incidents = Incident.query.all()
+            query = Incident.query
         
-        return jsonify({'incidents': [incident.to_dict() for incident in incidents]}), 200
+        query = with_serialized_relationships(query, Incident)
+        if wants_stream():
+            return stream_ndjson(query, Incident)
+        
+        try:
+            incidents, next_cursor = paginate(query, Incident)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'incidents': [incident.to_dict() for incident in incidents],
+            'next_cursor': next_cursor
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -35,7 +50,6 @@ def get_incidents():
 def create_incident():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         data = request.get_json()
         
@@ -80,10 +94,10 @@ def create_incident():
 
 @incidents_bp.route('/<int:incident_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(Incident)
 def get_incident(incident_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         incident = Incident.query.get(incident_id)
         if not incident:
@@ -103,7 +117,6 @@ def get_incident(incident_id):
 def update_incident(incident_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         incident = Incident.query.get(incident_id)
         if not incident:
@@ -161,7 +174,6 @@ def update_incident(incident_id):
 def delete_incident(incident_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         incident = Incident.query.get(incident_id)
         if not incident:
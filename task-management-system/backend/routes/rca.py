@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from database import db
-from models import RCA, Incident, User
+from models import RCA, Incident, with_serialized_relationships
+from etags import conditional_get
+from pagination import paginate
 
 rca_bp = Blueprint('rca', __name__)
 
@@ -10,18 +12,26 @@ def check_permission(current_user_role, required_roles):
 
 @rca_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(RCA, Incident)
 def get_rcas():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         # Members can only see their assigned RCAs
         if current_user.role == 'member':
-            rcas = RCA.query.filter_by(assigned_to=current_user_id).all()
+            query = RCA.query.filter_by(assigned_to=current_user_id)
         else:
-            rcas = RCA.query.all()
+            query = RCA.query
         
-        return jsonify({'rcas': [rca.to_dict() for rca in rcas]}), 200
+        try:
+            rcas, next_cursor = paginate(with_serialized_relationships(query, RCA), RCA)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'rcas': [rca.to_dict() for rca in rcas],
+            'next_cursor': next_cursor
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -31,7 +41,6 @@ def get_rcas():
 def create_rca():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         data = request.get_json()
         
@@ -77,10 +86,10 @@ def create_rca():
 
 @rca_bp.route('/<int:rca_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(RCA, Incident)
 def get_rca(rca_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         rca = RCA.query.get(rca_id)
         if not rca:
@@ -100,7 +109,6 @@ def get_rca(rca_id):
 def update_rca(rca_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         rca = RCA.query.get(rca_id)
         if not rca:
@@ -146,7 +154,6 @@ def update_rca(rca_id):
 def delete_rca(rca_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         rca = RCA.query.get(rca_id)
         if not rca:
@@ -166,10 +173,10 @@ def delete_rca(rca_id):
 
 @rca_bp.route('/by-incident/<int:incident_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(RCA, Incident)
 def get_rca_by_incident(incident_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         rca = RCA.query.filter_by(incident_id=incident_id).first()
         if not rca:
@@ -1,195 +1,120 @@
-from flask import Blueprint, request, jsonify, send_file
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from database import db
-from models import Task, Deployment, Incident, RCA, Asset, User
+from flask import Blueprint, request, jsonify, send_file, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from models import Task, Deployment, Incident, RCA, Asset
+from etags import conditional_get
+from dashboard import cached_dashboard_data
+from charts import create_chart
+from counters import ALL_SCOPE, ROLLUPS, rollup_counts, scope_counts
+from exports import EXPORTS, PDF_COLUMNS, export_query, export_rows, export_scope
+from exports import COLUMNAR_MIMETYPES, columnar_chunks, columnar_query
+from jobs import get_export_jobs
+from streaming import stream_attachment, stream_csv
 from datetime import datetime, timedelta
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-import io
-import base64
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-import os
-import tempfile
 
 reports_bp = Blueprint('reports', __name__)
 
+MAX_ANALYTICS_DAYS = 3650
+
 def check_permission(current_user_role, required_roles):
     return current_user_role in required_roles
 
 @reports_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
+@conditional_get(Task, Deployment, Incident, RCA, Asset)
 def get_dashboard_data():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
-        data = {}
         
-        if current_user.role == 'member':
-            # Member dashboard - only their data
-            data['tasks'] = {
-                'total': Task.query.filter((Task.assigned_to == current_user_id) | (Task.created_by == current_user_id)).count(),
-                'pending': Task.query.filter((Task.assigned_to == current_user_id) | (Task.created_by == current_user_id), Task.status == 'pending').count(),
-                'completed': Task.query.filter((Task.assigned_to == current_user_id) | (Task.created_by == current_user_id), Task.status == 'completed').count(),
-                'overdue': Task.query.filter((Task.assigned_to == current_user_id) | (Task.created_by == current_user_id), Task.status == 'overdue').count()
-            }
-            
-            data['deployments'] = {
-                'total': Deployment.query.filter_by(deployed_by=current_user_id).count(),
-                'successful': Deployment.query.filter_by(deployed_by=current_user_id, status='successful').count(),
-                'pending': Deployment.query.filter_by(deployed_by=current_user_id, status='pending').count(),
-                'failed': Deployment.query.filter_by(deployed_by=current_user_id, status='failed').count()
-            }
-            
-            data['incidents'] = {
-                'total': Incident.query.filter((Incident.assigned_to == current_user_id) | (Incident.created_by == current_user_id)).count(),
-                'open': Incident.query.filter((Incident.assigned_to == current_user_id) | (Incident.created_by == current_user_id), Incident.status == 'open').count(),
-                'resolved': Incident.query.filter((Incident.assigned_to == current_user_id) | (Incident.created_by == current_user_id), Incident.status == 'resolved').count()
-            }
-            
-            data['assets'] = {
-                'total': Asset.query.filter_by(owner_id=current_user_id).count()
-            }
-        else:
-            # Manager/Supervisor dashboard - all data
-            data['tasks'] = {
-                'total': Task.query.count(),
-                'pending': Task.query.filter_by(status='pending').count(),
-                'completed': Task.query.filter_by(status='completed').count(),
-                'overdue': Task.query.filter_by(status='overdue').count()
-            }
-            
-            data['deployments'] = {
-                'total': Deployment.query.count(),
-                'successful': Deployment.query.filter_by(status='successful').count(),
-                'pending': Deployment.query.filter_by(status='pending').count(),
-                'failed': Deployment.query.filter_by(status='failed').count()
-            }
-            
-            data['incidents'] = {
-                'total': Incident.query.count(),
-                'open': Incident.query.filter_by(status='open').count(),
-                'investigating': Incident.query.filter_by(status='investigating').count(),
-                'resolved': Incident.query.filter_by(status='resolved').count(),
-                'closed': Incident.query.filter_by(status='closed').count()
-            }
-            
-            data['rca'] = {
-                'total': RCA.query.count(),
-                'draft': RCA.query.filter_by(status='draft').count(),
-                'approved': RCA.query.filter_by(status='approved').count(),
-                'implemented': RCA.query.filter_by(status='implemented').count()
-            }
-            
-            data['assets'] = {
-                'total': Asset.query.count(),
-                'by_type': {}
-            }
-            
-            # Asset breakdown by type
-            asset_types = db.session.query(Asset.asset_type, db.func.count(Asset.id)).group_by(Asset.asset_type).all()
-            for asset_type, count in asset_types:
-                if asset_type:
-                    data['assets']['by_type'][asset_type] = count
+        data, stale = cached_dashboard_data(current_user.role, current_user_id)
         
-        return jsonify({'dashboard': data}), 200
+        response = jsonify({'dashboard': data})
+        if stale:
+            # Left untagged so clients don't keep old counts under a current ETag
+            response.headers['Cache-Control'] = 'no-store'
+        return response, 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def create_chart(chart_type, data, title, labels=None):
-    """Create a chart and return base64 encoded image"""
-    plt.figure(figsize=(10, 6))
-    
-    if chart_type == 'bar':
-        if labels:
-            plt.bar(labels, data)
-        else:
-            plt.bar(range(len(data)), data)
-    elif chart_type == 'pie':
-        plt.pie(data, labels=labels, autopct='%1.1f%%')
-    elif chart_type == 'line':
-        plt.plot(data)
-    
-    plt.title(title)
-    plt.tight_layout()
-    
-    # Save to base64
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.getvalue()).decode()
-    plt.close()
-    
-    return image_base64
+def rollup_totals(by_day):
+    """Sum {day: {value: count}} over the days into {value: count}"""
+    totals = {}
+    for counts in by_day.values():
+        for value, count in counts.items():
+            totals[value] = totals.get(value, 0) + count
+    return totals
+
+def rollup_series(by_day, days, value=None):
+    """Daily counts of value for each day in days, zero where nothing happened"""
+    return [by_day.get(day, {}).get(value, 0) for day in days]
+
+def utc_today():
+    return datetime.utcnow().date().isoformat()
 
 @reports_bp.route('/analytics', methods=['GET'])
 @jwt_required()
+# The window moves with the date even when no rows change
+@conditional_get(Task, Deployment, Incident, Asset, vary=utc_today)
 def get_analytics():
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
         if not check_permission(current_user.role, ['manager', 'supervisor']):
             return jsonify({'error': 'Insufficient permissions'}), 403
         
-        # Get date range
-        days = int(request.args.get('days', 30))
-        start_date = datetime.utcnow() - timedelta(days=days)
-        
-        analytics = {}
-        
-        # Task analytics
-        task_status_counts = db.session.query(
-            Task.status, db.func.count(Task.id)
-        ).group_by(Task.status).all()
+        # Get date range: the last `days` days, today included
+        try:
+            days = int(request.args.get('days', 30))
+        except ValueError:
+            return jsonify({'error': 'days must be an integer'}), 400
+        if days < 1 or days > MAX_ANALYTICS_DAYS:
+            return jsonify({'error': f'days must be between 1 and {MAX_ANALYTICS_DAYS}'}), 400
+        end_date = datetime.utcnow().date()
+        start_date = end_date - timedelta(days=days - 1)
+        window = [start_date + timedelta(days=offset) for offset in range(days)]
+        
+        analytics = {
+            'window': {'days': days, 'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()}
+        }
         
-        task_priority_counts = db.session.query(
-            Task.priority, db.func.count(Task.id)
-        ).group_by(Task.priority).all()
+        # Current distributions come from the status counters, activity in the
+        # window from the daily rollups: one query each
+        counts = scope_counts(ALL_SCOPE)
+        rollups = rollup_counts(list(ROLLUPS), start_date, end_date)
         
         analytics['tasks'] = {
-            'status_distribution': {status: count for status, count in task_status_counts},
-            'priority_distribution': {priority: count for priority, count in task_priority_counts}
+            'status_distribution': counts.get(('tasks', 'status'), {}),
+            'priority_distribution': counts.get(('tasks', 'priority'), {}),
+            'created': sum(rollup_totals(rollups['tasks_created']).values()),
+            'completed': sum(rollup_totals(rollups['tasks_completed']).values())
         }
         
-        # Deployment analytics
-        deployment_status_counts = db.session.query(
-            Deployment.status, db.func.count(Deployment.id)
-        ).group_by(Deployment.status).all()
-        
         analytics['deployments'] = {
-            'status_distribution': {status: count for status, count in deployment_status_counts}
+            'status_distribution': rollup_totals(rollups['deployments'])
         }
         
-        # Incident analytics
-        incident_severity_counts = db.session.query(
-            Incident.severity, db.func.count(Incident.id)
-        ).group_by(Incident.severity).all()
-        
         analytics['incidents'] = {
-            'severity_distribution': {severity: count for severity, count in incident_severity_counts}
+            'severity_distribution': rollup_totals(rollups['incidents'])
         }
         
-        # Asset analytics
-        asset_type_counts = db.session.query(
-            Asset.asset_type, db.func.count(Asset.id)
-        ).filter(Asset.asset_type.isnot(None)).group_by(Asset.asset_type).all()
+        analytics['trends'] = {
+            'dates': [day.isoformat() for day in window],
+            'tasks_created': rollup_series(rollups['tasks_created'], window),
+            'tasks_completed': rollup_series(rollups['tasks_completed'], window),
+            'incidents': {
+                severity: rollup_series(rollups['incidents'], window, severity)
+                for severity in analytics['incidents']['severity_distribution']
+            },
+            'deployments': {
+                status: rollup_series(rollups['deployments'], window, status)
+                for status in analytics['deployments']['status_distribution']
+            }
+        }
         
-        asset_value_counts = db.session.query(
-            Asset.asset_value_rating, db.func.count(Asset.id)
-        ).filter(Asset.asset_value_rating.isnot(None)).group_by(Asset.asset_value_rating).all()
+        asset_type_counts = counts.get(('assets', 'asset_type'), {})
+        asset_value_counts = counts.get(('assets', 'asset_value_rating'), {})
         
         analytics['assets'] = {
-            'type_distribution': {asset_type: count for asset_type, count in asset_type_counts},
-            'value_distribution': {rating: count for rating, count in asset_value_counts}
+            'type_distribution': {asset_type: count for asset_type, count in asset_type_counts.items() if asset_type},
+            'value_distribution': {rating: count for rating, count in asset_value_counts.items() if rating}
         }
         
         # Generate charts
@@ -216,82 +141,74 @@ def get_analytics():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def job_response(job):
+    """Public view of an export job, with its download link once it is done"""
+    response = {
+        'id': job['id'],
+        'format': job['format'],
+        'type': job['type'],
+        'status': job['status'],
+        'rows_done': job['rows_done'],
+        'rows_total': job['rows_total'],
+        'error': job['error'],
+        'created_at': datetime.utcfromtimestamp(job['created_at']).isoformat(),
+        'expires_at': datetime.utcfromtimestamp(job['expires_at']).isoformat() if job['expires_at'] else None,
+        'download_url': None
+    }
+    if job['status'] == 'done':
+        response['download_url'] = url_for('reports.download_export_job', job_id=job['id'])
+    return response
+
+def submit_export(export_format, report_type, options=None):
+    current_user_id = get_jwt_identity()
+    job = get_export_jobs().submit(export_format, report_type, current_user.role, current_user_id, options)
+    return jsonify({'job': job_response(job)}), 202
+
 @reports_bp.route('/export/csv', methods=['POST'])
 @jwt_required()
 def export_csv():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
-        data = request.get_json()
+        data = request.get_json() or {}
         report_type = data.get('type', 'tasks')
         
-        # Get data based on type and user permissions
-        if report_type == 'tasks':
-            if current_user.role == 'member':
-                tasks = Task.query.filter(
-                    (Task.assigned_to == current_user_id) | (Task.created_by == current_user_id)
-                ).all()
-            else:
-                tasks = Task.query.all()
-            
-            df_data = []
-            for task in tasks:
-                df_data.append({
-                    'ID': task.id,
-                    'Name': task.name,
-                    'Description': task.description,
-                    'Priority': task.priority,
-                    'Status': task.status,
-                    'Due Date': task.due_date.isoformat() if task.due_date else '',
-                    'Created By': task.creator.username if task.creator else '',
-                    'Assigned To': task.assignee.username if task.assignee else '',
-                    'Created At': task.created_at.isoformat()
-                })
-            
-            df = pd.DataFrame(df_data)
-            
-        elif report_type == 'assets':
-            if current_user.role == 'member':
-                assets = Asset.query.filter_by(owner_id=current_user_id).all()
-            else:
-                assets = Asset.query.all()
-            
-            df_data = []
-            for asset in assets:
-                df_data.append({
-                    'ID': asset.id,
-                    'Server Name': asset.server_name,
-                    'Asset ID': asset.asset_id,
-                    'Serial Number': asset.serial_number,
-                    'IP Address': asset.ip_address,
-                    'Operating System': asset.operating_system,
-                    'Asset Type': asset.asset_type,
-                    'Owner': asset.asset_owner.username if asset.asset_owner else '',
-                    'Created At': asset.created_at.isoformat()
-                })
-            
-            df = pd.DataFrame(df_data)
-        
-        else:
+        if report_type not in EXPORTS:
             return jsonify({'error': 'Invalid report type'}), 400
         
-        # Create CSV file
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_data = csv_buffer.getvalue()
+        # Large exports can be written in the background and fetched when done
+        if data.get('background'):
+            return submit_export('csv', report_type)
         
-        # Return as downloadable file
-        output = io.BytesIO()
-        output.write(csv_data.encode('utf-8'))
-        output.seek(0)
+        # Streamed from a server-side cursor straight into the response
+        query = export_query(report_type, current_user.role, current_user_id)
+        header = [header for header, _ in EXPORTS[report_type].columns]
+        filename = f'{report_type}_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+        return stream_csv(export_rows(query), header, filename)
         
-        return send_file(
-            output,
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=f'{report_type}_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.route('/export/<any(parquet, arrow):export_format>', methods=['POST'])
+@jwt_required()
+def export_columnar(export_format):
+    try:
+        current_user_id = get_jwt_identity()
+        
+        data = request.get_json() or {}
+        report_type = data.get('type', 'tasks')
+        
+        if report_type not in EXPORTS:
+            return jsonify({'error': 'Invalid report type'}), 400
+        
+        if data.get('background'):
+            return submit_export(export_format, report_type)
+        
+        # Typed record batches written from the query straight into the response
+        query, schema, enums = columnar_query(report_type, current_user.role, current_user_id)
+        chunks = columnar_chunks(export_format, query, schema, enums)
+        filename = f'{report_type}_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+        return stream_attachment(chunks, COLUMNAR_MIMETYPES[export_format], filename)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -300,95 +217,60 @@ def export_csv():
 @jwt_required()
 def export_pdf():
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
-        data = request.get_json()
+        data = request.get_json() or {}
         report_type = data.get('type', 'tasks')
         
-        # Create PDF
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        
-        # Styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-        )
+        if report_type not in PDF_COLUMNS:
+            return jsonify({'error': 'Invalid report type'}), 400
+        
+        options = {
+            'summary': bool(data.get('include_summary', True)),
+            'charts': bool(data.get('include_charts', False))
+        }
+        
+        # Built by the export workers; poll the job for its download link
+        return submit_export('pdf', report_type, options)
         
-        # Content
-        content = []
-        
-        # Title
-        title = f"{report_type.title()} Report - Generated on {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        content.append(Paragraph(title, title_style))
-        content.append(Spacer(1, 12))
-        
-        # Get data and create table
-        if report_type == 'tasks':
-            if current_user.role == 'member':
-                tasks = Task.query.filter(
-                    (Task.assigned_to == current_user_id) | (Task.created_by == current_user_id)
-                ).all()
-            else:
-                tasks = Task.query.all()
-            
-            table_data = [['Name', 'Priority', 'Status', 'Due Date', 'Assigned To']]
-            for task in tasks:
-                table_data.append([
-                    task.name[:30] + '...' if len(task.name) > 30 else task.name,
-                    task.priority,
-                    task.status,
-                    task.due_date.strftime('%Y-%m-%d') if task.due_date else 'N/A',
-                    task.assignee.username if task.assignee else 'Unassigned'
-                ])
-        
-        elif report_type == 'assets':
-            if current_user.role == 'member':
-                assets = Asset.query.filter_by(owner_id=current_user_id).all()
-            else:
-                assets = Asset.query.all()
-            
-            table_data = [['Server Name', 'Asset ID', 'Type', 'IP Address', 'Owner']]
-            for asset in assets:
-                table_data.append([
-                    asset.server_name,
-                    asset.asset_id,
-                    asset.asset_type or 'N/A',
-                    asset.ip_address or 'N/A',
-                    asset.asset_owner.username if asset.asset_owner else 'N/A'
-                ])
-        
-        # Create table
-        table = Table(table_data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        content.append(table)
-        
-        # Build PDF
-        doc.build(content)
-        buffer.seek(0)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def find_job(job_id):
+    """The job if it exists and belongs to the caller's scope"""
+    job = get_export_jobs().get(job_id)
+    if job is None or job['scope'] != export_scope(current_user.role, get_jwt_identity()):
+        return None
+    return job
+
+@reports_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_export_job(job_id):
+    try:
+        job = find_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Export job not found'}), 404
+        
+        return jsonify({'job': job_response(job)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.route('/jobs/<job_id>/download', methods=['GET'])
+@jwt_required()
+def download_export_job(job_id):
+    try:
+        job = find_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Export job not found'}), 404
+        
+        if job['status'] != 'done':
+            return jsonify({'error': f"Export is {job['status']}", 'job': job_response(job)}), 409
         
         return send_file(
-            buffer,
-            mimetype='application/pdf',
+            get_export_jobs().artifact_path(job),
+            mimetype=job['mimetype'],
             as_attachment=True,
-            download_name=f'{report_type}_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+            download_name=job['filename']
         )
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
@@ -1,34 +1,88 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from database import db
-from models import Task, Deployment, Incident, RCA, Asset, User
-from sqlalchemy import or_, and_
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from models import Task, Deployment, Incident, RCA, Asset
+from changes import get_table_versions
+from etags import conditional_get, request_table_versions
+from fieldsets import get_requested_fields, with_fields
+from search_index import classify_identifier, identifier_search, text_search
+from suggestion_index import suggestion_index
+from search_cache import normalize_query, search_cache, search_scope
+from sqlalchemy import or_
+from concurrent.futures import ThreadPoolExecutor
 
 search_bp = Blueprint('search', __name__)
 
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Matches counted per entity type; past this, totals are lower bounds
+SEARCH_COUNT_CAP = 1000
+SEARCH_WORKERS = 5
+
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix='search')
+
 def check_permission(current_user_role, required_roles):
     return current_user_role in required_roles
 
+def search_entity(app, model, search_text, user_filter, fields, limit, offset):
+    """Search one entity type in its own app context.
+
+    Returns (serialized page, match count capped at SEARCH_COUNT_CAP,
+    whether another page exists).
+    """
+    with app.app_context():
+        query = text_search(model, search_text).filter(user_filter)
+        return search_page(query, model, fields, limit, offset)
+
+def search_page(query, model, fields, limit, offset):
+    """Count and fetch one page of an ordered search query"""
+    total = query.order_by(None).limit(SEARCH_COUNT_CAP).count()
+    
+    rows = with_fields(query, model, fields).offset(offset).limit(limit + 1).all()
+    if fields is not None:
+        page = [row.to_dict(fields) for row in rows[:limit]]
+    else:
+        page = [row.to_dict() for row in rows[:limit]]
+    return page, total, len(rows) > limit
+
 @search_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(Task, Deployment, Incident, RCA, Asset)
 def global_search():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
-        query = request.args.get('q', '').strip()
+        query = ' '.join(request.args.get('q', '').split())
         if not query:
             return jsonify({'error': 'Search query is required'}), 400
         
         search_type = request.args.get('type', 'all')  # all, tasks, deployments, incidents, rca, assets
         
-        results = {
-            'tasks': [],
-            'deployments': [],
-            'incidents': [],
-            'rca': [],
-            'assets': []
-        }
+        # Optional sparse fieldset for asset results
+        try:
+            asset_fields = get_requested_fields(Asset)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        try:
+            limit = min(int(request.args.get('limit', DEFAULT_SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+            offset = int(request.args.get('offset', 0))
+        except ValueError:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+        if limit < 1 or offset < 0:
+            return jsonify({'error': 'limit must be positive and offset not negative'}), 400
+        
+        # Identifier lookups try the typed, lower and upper case only, so
+        # mixed-case identifiers are keyed as typed
+        query_key = query if classify_identifier(query) else normalize_query(query)
+        cache_key = (
+            'search', query_key, search_type, search_scope(current_user.role, current_user_id),
+            limit, offset, tuple(asset_fields) if asset_fields else None,
+            # Writes made by other workers change the versions and so the key
+            request_table_versions()
+        )
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            return jsonify({**cached, 'query': query}), 200
         
         # Build search filter based on user role
         def get_user_filter_tasks():
@@ -56,95 +110,59 @@ def global_search():
                 return Asset.owner_id == current_user_id
             return True
         
-        # Search Tasks
-        if search_type in ['all', 'tasks']:
-            task_search = or_(
-                Task.name.ilike(f'%{query}%'),
-                Task.description.ilike(f'%{query}%'),
-                Task.priority.ilike(f'%{query}%'),
-                Task.status.ilike(f'%{query}%')
-            )
-            
-            tasks = Task.query.filter(
-                and_(task_search, get_user_filter_tasks())
-            ).all()
-            
-            results['tasks'] = [task.to_dict() for task in tasks]
-        
-        # Search Deployments
-        if search_type in ['all', 'deployments']:
-            deployment_search = or_(
-                Deployment.name.ilike(f'%{query}%'),
-                Deployment.description.ilike(f'%{query}%'),
-                Deployment.status.ilike(f'%{query}%'),
-                Deployment.backup_location.ilike(f'%{query}%')
-            )
-            
-            deployments = Deployment.query.filter(
-                and_(deployment_search, get_user_filter_deployments())
-            ).all()
-            
-            results['deployments'] = [deployment.to_dict() for deployment in deployments]
-        
-        # Search Incidents
-        if search_type in ['all', 'incidents']:
-            incident_search = or_(
-                Incident.name.ilike(f'%{query}%'),
-                Incident.description.ilike(f'%{query}%'),
-                Incident.severity.ilike(f'%{query}%'),
-                Incident.status.ilike(f'%{query}%')
-            )
-            
-            incidents = Incident.query.filter(
-                and_(incident_search, get_user_filter_incidents())
-            ).all()
-            
-            results['incidents'] = [incident.to_dict() for incident in incidents]
-        
-        # Search RCA
-        if search_type in ['all', 'rca']:
-            rca_search = or_(
-                RCA.root_cause.ilike(f'%{query}%'),
-                RCA.corrective_actions.ilike(f'%{query}%'),
-                RCA.preventive_actions.ilike(f'%{query}%'),
-                RCA.status.ilike(f'%{query}%')
-            )
-            
-            rcas = RCA.query.filter(
-                and_(rca_search, get_user_filter_rca())
-            ).all()
-            
-            results['rca'] = [rca.to_dict() for rca in rcas]
-        
-        # Search Assets
-        if search_type in ['all', 'assets']:
-            asset_search = or_(
-                Asset.server_name.ilike(f'%{query}%'),
-                Asset.asset_id.ilike(f'%{query}%'),
-                Asset.serial_number.ilike(f'%{query}%'),
-                Asset.ip_address.ilike(f'%{query}%'),
-                Asset.host_name.ilike(f'%{query}%'),
-                Asset.operating_system.ilike(f'%{query}%'),
-                Asset.vendor.ilike(f'%{query}%'),
-                Asset.make_model.ilike(f'%{query}%'),
-                Asset.asset_type.ilike(f'%{query}%'),
-                Asset.purpose.ilike(f'%{query}%')
+        searches = {
+            'tasks': (Task, get_user_filter_tasks(), None),
+            'deployments': (Deployment, get_user_filter_deployments(), None),
+            'incidents': (Incident, get_user_filter_incidents(), None),
+            'rca': (RCA, get_user_filter_rca(), None),
+            'assets': (Asset, get_user_filter_assets(), asset_fields)
+        }
+        
+        results = {key: [] for key in searches}
+        totals = {key: 0 for key in searches}
+        next_offset = {key: None for key in searches}
+        
+        # IPs, hostnames and asset tags go straight to the indexed asset columns;
+        # assets fall back to full-text search when that finds nothing, and the
+        # other entity types are searched as usual either way
+        matched_on = None
+        identifier = identifier_search(query) if search_type in ['all', 'assets'] else None
+        if identifier is not None:
+            kind, identifier_query = identifier
+            page, total, has_more = search_page(
+                identifier_query.filter(get_user_filter_assets()), Asset, asset_fields, limit, offset
             )
-            
-            assets = Asset.query.filter(
-                and_(asset_search, get_user_filter_assets())
-            ).all()
-            
-            results['assets'] = [asset.to_dict() for asset in assets]
+            if total:
+                matched_on = kind
+                results['assets'], totals['assets'] = page, total
+                if has_more:
+                    next_offset['assets'] = offset + limit
+        
+        # Each entity type is searched concurrently on the search pool
+        app = current_app._get_current_object()
+        futures = {
+            key: search_executor.submit(search_entity, app, model, query, user_filter, fields, limit, offset)
+            for key, (model, user_filter, fields) in searches.items()
+            if search_type in ['all', key] and not (key == 'assets' and matched_on)
+        }
         
-        # Calculate total results
-        total_results = sum(len(results[key]) for key in results)
+        for key, future in futures.items():
+            results[key], totals[key], has_more = future.result()
+            if has_more:
+                next_offset[key] = offset + limit
         
-        return jsonify({
+        response = {
             'query': query,
-            'total_results': total_results,
-            'results': results
-        }), 200
+            'matched_on': matched_on,
+            'total_results': sum(totals.values()),
+            'totals': totals,
+            'results': results,
+            'next_offset': next_offset
+        }
+        # Results include usernames, so user changes invalidate them too
+        searched = [key for key in searches if search_type in ['all', key]]
+        search_cache.put(cache_key, response, [searches[key][0].__tablename__ for key in searched] + ['users'])
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -154,56 +172,39 @@ def global_search():
 def search_suggestions():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         query = request.args.get('q', '').strip()
         if len(query) < 2:
             return jsonify({'suggestions': []}), 200
         
+        tables = [Task.__tablename__, Deployment.__tablename__, Incident.__tablename__, Asset.__tablename__]
+        # Writes made by other workers change the versions and so the key
+        versions = tuple(sorted(get_table_versions(tables).items()))
+        cache_key = ('suggestions', normalize_query(query), search_scope(current_user.role, current_user_id), versions)
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            return jsonify(cached), 200
+        
         suggestions = []
         
+        # Catches up once the versions move, or every few seconds; lookups are in memory
+        suggestion_index.sync(versions)
+        
         # Get suggestions based on user role
         if current_user.role == 'member':
-            # Tasks
-            tasks = Task.query.filter(
-                and_(
-                    or_(Task.assigned_to == current_user_id, Task.created_by == current_user_id),
-                    Task.name.ilike(f'%{query}%')
-                )
-            ).limit(5).all()
-            suggestions.extend([{'type': 'task', 'value': task.name, 'id': task.id} for task in tasks])
-            
-            # Assets
-            assets = Asset.query.filter(
-                and_(
-                    Asset.owner_id == current_user_id,
-                    or_(
-                        Asset.server_name.ilike(f'%{query}%'),
-                        Asset.asset_id.ilike(f'%{query}%')
-                    )
-                )
-            ).limit(5).all()
-            suggestions.extend([{'type': 'asset', 'value': asset.server_name, 'id': asset.id} for asset in assets])
+            # Only tasks and assets the member owns
+            for kind in ['task', 'asset']:
+                matches = suggestion_index.lookup(kind, query, 5, owner_id=current_user_id)
+                suggestions.extend([{'type': kind, 'value': value, 'id': record_id} for value, record_id in matches])
         else:
             # All entities for managers/supervisors
-            tasks = Task.query.filter(Task.name.ilike(f'%{query}%')).limit(3).all()
-            suggestions.extend([{'type': 'task', 'value': task.name, 'id': task.id} for task in tasks])
-            
-            deployments = Deployment.query.filter(Deployment.name.ilike(f'%{query}%')).limit(3).all()
-            suggestions.extend([{'type': 'deployment', 'value': deployment.name, 'id': deployment.id} for deployment in deployments])
-            
-            incidents = Incident.query.filter(Incident.name.ilike(f'%{query}%')).limit(3).all()
-            suggestions.extend([{'type': 'incident', 'value': incident.name, 'id': incident.id} for incident in incidents])
-            
-            assets = Asset.query.filter(
-                or_(
-                    Asset.server_name.ilike(f'%{query}%'),
-                    Asset.asset_id.ilike(f'%{query}%')
-                )
-            ).limit(3).all()
-            suggestions.extend([{'type': 'asset', 'value': asset.server_name, 'id': asset.id} for asset in assets])
-        
-        return jsonify({'suggestions': suggestions[:10]}), 200
+            for kind in ['task', 'deployment', 'incident', 'asset']:
+                matches = suggestion_index.lookup(kind, query, 3)
+                suggestions.extend([{'type': kind, 'value': value, 'id': record_id} for value, record_id in matches])
+        
+        response = {'suggestions': suggestions[:10]}
+        search_cache.put(cache_key, response, tables)
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
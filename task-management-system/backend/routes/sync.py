@@ -0,0 +1,178 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from database import db
+from changes import sync_retention_cutoff
+from models import (
+    Task, Deployment, Incident, RCA, Asset, User, Tombstone,
+    member_scope_filter, with_serialized_relationships
+)
+from pagination import MAX_PAGE_SIZE
+from sqlalchemy import or_
+from datetime import datetime, timedelta, timezone
+import base64
+import json
+
+sync_bp = Blueprint('sync', __name__)
+
+# Response key -> model, in the order changes are reported
+SYNC_MODELS = {
+    'users': User,
+    'tasks': Task,
+    'deployments': Deployment,
+    'incidents': Incident,
+    'rca': RCA,
+    'assets': Asset
+}
+
+# Rows committed slightly before a token was issued can become visible after
+# it; re-sending this window makes sure they are not missed. Clients upsert
+# by id, so the repeats are harmless.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+SYNC_PAGE_SIZE = 500
+
+def check_permission(current_user_role, required_roles):
+    return current_user_role in required_roles
+
+def naive_utc(timestamp):
+    """Timestamps are compared as naive UTC; convert any that carry an offset"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def encode_sync_token(timestamp):
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode('utf-8')).decode('ascii')
+
+def decode_sync_token(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return naive_utc(datetime.fromisoformat(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid sync token')
+
+def encode_sync_cursor(started, since, table, after_id):
+    """Opaque position in a sync walking the tables in SYNC_MODELS order"""
+    raw = json.dumps({
+        'started': started.isoformat(),
+        'since': since.isoformat() if since else None,
+        'table': table,
+        'after_id': after_id
+    })
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_sync_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        started = naive_utc(datetime.fromisoformat(raw['started']))
+        since = naive_utc(datetime.fromisoformat(raw['since'])) if raw['since'] else None
+        table, after_id = raw['table'], raw['after_id']
+    except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+        raise ValueError('Invalid sync cursor')
+    if table not in SYNC_MODELS or not isinstance(after_id, int):
+        raise ValueError('Invalid sync cursor')
+    return started, since, table, after_id
+
+def is_member_scoped(model):
+    """Same visibility as the list routes"""
+    if model is User:
+        return not check_permission(current_user.role, ['super_admin', 'manager', 'supervisor'])
+    return current_user.role == 'member'
+
+def deleted_ids(model, since, user_id):
+    """Ids of model's rows the caller should drop: deleted, or moved out of a member's scope"""
+    tombstones = db.session.query(Tombstone.record_id).filter(
+        Tombstone.table_name == model.__tablename__,
+        Tombstone.deleted_at > since
+    )
+    if is_member_scoped(model):
+        tombstones = tombstones.filter(or_(
+            Tombstone.scope_user_id == user_id,
+            Tombstone.alt_scope_user_id == user_id
+        ))
+    else:
+        # Rows leaving a member's scope are still visible here
+        tombstones = tombstones.filter(Tombstone.kind == 'deleted')
+    return sorted({record_id for record_id, in tombstones.all()})
+
+@sync_bp.route('/', methods=['GET'])
+@jwt_required()
+def sync_changes():
+    """Rows changed since a sync token, a page at a time.
+
+    Without ?since= every visible row is sent. A response with a
+    next_cursor has more rows: request ?cursor= to continue. The last page
+    carries next_token for the next delta sync. Deleted ids come on the
+    first page and are to be applied before the changed rows.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        
+        try:
+            limit = min(int(request.args.get('limit', SYNC_PAGE_SIZE)), MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if limit < 1:
+            return jsonify({'error': 'limit must be positive'}), 400
+        
+        first_page = not request.args.get('cursor')
+        if first_page:
+            # Issued before querying so nothing committed meanwhile is skipped
+            started = datetime.utcnow()
+            since = None
+            if request.args.get('since'):
+                try:
+                    since = decode_sync_token(request.args['since']) - SYNC_OVERLAP
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+            table, after_id = next(iter(SYNC_MODELS)), 0
+        else:
+            try:
+                started, since, table, after_id = decode_sync_cursor(request.args['cursor'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        # Deletions older than the retention window may have been pruned
+        if since is not None and since < sync_retention_cutoff():
+            return jsonify({'error': 'Sync token expired; resync without since', 'resync': True}), 410
+        
+        changes = {key: [] for key in SYNC_MODELS}
+        deleted = {key: [] for key in SYNC_MODELS}
+        if first_page and since is not None:
+            for key, model in SYNC_MODELS.items():
+                deleted[key] = deleted_ids(model, since, current_user_id)
+        
+        # Walk the tables in order from the cursor until the page is full
+        next_cursor = None
+        keys = list(SYNC_MODELS)
+        remaining = limit
+        for key in keys[keys.index(table):]:
+            model = SYNC_MODELS[key]
+            query = with_serialized_relationships(model.query, model).filter(model.id > after_id)
+            if is_member_scoped(model):
+                query = query.filter(member_scope_filter(model, current_user_id))
+            if since is not None:
+                query = query.filter(model.updated_at > since)
+            rows = query.order_by(model.id).limit(remaining + 1).all()
+            
+            if len(rows) > remaining:
+                rows = rows[:remaining]
+                changes[key] = [row.to_dict() for row in rows]
+                next_cursor = encode_sync_cursor(started, since, key, rows[-1].id)
+                break
+            changes[key] = [row.to_dict() for row in rows]
+            remaining -= len(rows)
+            after_id = 0
+            if remaining == 0 and key != keys[-1]:
+                next_cursor = encode_sync_cursor(started, since, keys[keys.index(key) + 1], 0)
+                break
+        
+        return jsonify({
+            'changes': changes,
+            'deleted': deleted,
+            'next_cursor': next_cursor,
+            'next_token': None if next_cursor else encode_sync_token(started)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
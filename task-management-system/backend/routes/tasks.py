@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from database import db
-from models import Task, User
+from models import Task, with_serialized_relationships
+from etags import conditional_get
+from pagination import paginate
+from streaming import wants_stream, stream_ndjson
 from datetime import datetime
 
 tasks_bp = Blueprint('tasks', __name__)
@@ -11,18 +14,30 @@ def check_permission(current_user_role, required_roles):
 
 @tasks_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(Task)
 def get_tasks():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         # Members can only see their assigned tasks
         if current_user.role == 'member':
-            tasks = Task.query.filter_by(assigned_to=current_user_id).all()
+            query = Task.query.filter_by(assigned_to=current_user_id)
         else:
-            tasks = Task.query.all()
+            query = Task.query
         
-        return jsonify({'tasks': [task.to_dict() for task in tasks]}), 200
+        query = with_serialized_relationships(query, Task)
+        if wants_stream():
+            return stream_ndjson(query, Task)
+        
+        try:
+            tasks, next_cursor = paginate(query, Task)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'tasks': [task.to_dict() for task in tasks],
+            'next_cursor': next_cursor
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -32,7 +47,6 @@ def get_tasks():
 def create_task():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         data = request.get_json()
         
@@ -75,10 +89,10 @@ def create_task():
 
 @tasks_bp.route('/<int:task_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(Task)
 def get_task(task_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         task = Task.query.get(task_id)
         if not task:
@@ -98,7 +112,6 @@ def get_task(task_id):
 def update_task(task_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         task = Task.query.get(task_id)
         if not task:
@@ -158,7 +171,6 @@ def update_task(task_id):
 def delete_task(task_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         task = Task.query.get(task_id)
         if not task:
@@ -178,17 +190,26 @@ def delete_task(task_id):
 
 @tasks_bp.route('/my-tasks', methods=['GET'])
 @jwt_required()
+@conditional_get(Task)
 def get_my_tasks():
     try:
         current_user_id = get_jwt_identity()
         
-        assigned_tasks = Task.query.filter_by(assigned_to=current_user_id).all()
-        created_tasks = Task.query.filter_by(created_by=current_user_id).all()
+        # Assigned or created tasks, without duplicates
+        query = Task.query.filter(
+            (Task.assigned_to == current_user_id) |
+            (Task.created_by == current_user_id)
+        )
         
-        # Combine and remove duplicates
-        all_tasks = list({task.id: task for task in assigned_tasks + created_tasks}.values())
+        try:
+            tasks, next_cursor = paginate(with_serialized_relationships(query, Task), Task)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify({'tasks': [task.to_dict() for task in all_tasks]}), 200
+        return jsonify({
+            'tasks': [task.to_dict() for task in tasks],
+            'next_cursor': next_cursor
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from database import db
 from models import User
+from passwords import PasswordPoolBusy
+from etags import conditional_get
+from pagination import paginate
 from datetime import datetime
 
 users_bp = Blueprint('users', __name__)
@@ -11,16 +14,21 @@ def check_permission(current_user_role, required_roles):
 
 @users_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get()
 def get_users():
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
         if not check_permission(current_user.role, ['super_admin', 'manager', 'supervisor']):
             return jsonify({'error': 'Insufficient permissions'}), 403
         
-        users = User.query.all()
-        return jsonify({'users': [user.to_dict() for user in users]}), 200
+        try:
+            users, next_cursor = paginate(User.query, User)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'users': [user.to_dict() for user in users],
+            'next_cursor': next_cursor
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -30,7 +38,6 @@ def get_users():
 def create_user():
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         data = request.get_json()
         role = data.get('role')
@@ -77,15 +84,17 @@ def create_user():
             'user': new_user.to_dict()
         }), 201
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @users_bp.route('/<int:user_id>', methods=['GET'])
 @jwt_required()
+@conditional_get()
 def get_user(user_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         # Users can view their own profile or higher roles can view all
         if current_user_id != user_id and not check_permission(current_user.role, ['super_admin', 'manager', 'supervisor']):
@@ -105,7 +114,6 @@ def get_user(user_id):
 def update_user(user_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         user = User.query.get(user_id)
         if not user:
@@ -147,7 +155,6 @@ def update_user(user_id):
 def delete_user(user_id):
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
         
         if not check_permission(current_user.role, ['super_admin', 'manager', 'supervisor']):
             return jsonify({'error': 'Insufficient permissions'}), 403
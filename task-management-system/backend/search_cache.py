@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from changes import on_commit
+
+SEARCH_CACHE_SIZE = 1000
+SEARCH_CACHE_TTL_SECONDS = 30
+
+def normalize_query(search_text):
+    """Case- and whitespace-insensitive form of a search used in cache keys"""
+    return ' '.join(search_text.lower().split())
+
+def search_scope(role, user_id):
+    """Visibility scope of a caller: members see only their own records"""
+    return f'user:{user_id}' if role == 'member' else 'all'
+
+class SearchCache:
+    """Per-process LRU cache of search responses with a TTL.
+
+    Each entry records the tables its results were read from and is evicted
+    as soon as a row in any of them commits in this process; the TTL bounds
+    how long other workers' writes can go unseen.
+    """
+
+    def __init__(self, max_entries=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_table = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    self._discard(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key, value, table_names):
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, frozenset(table_names))
+            for table_name in table_names:
+                self._keys_by_table.setdefault(table_name, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for table_name in entry[2]:
+            keys = self._keys_by_table.get(table_name)
+            if keys is not None:
+                keys.discard(key)
+
+    def invalidate_tables(self, table_names):
+        with self._lock:
+            keys = set()
+            for table_name in table_names:
+                keys.update(self._keys_by_table.pop(table_name, ()))
+            for key in keys:
+                self._discard(key)
+            self._invalidations += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else None,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations
+            }
+
+search_cache = SearchCache()
+
+@on_commit
+def _evict_changed_tables(changes):
+    search_cache.invalidate_tables({change.table_name for change in changes})
+
+def search_cache_stats():
+    return search_cache.stats()
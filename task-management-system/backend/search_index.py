@@ -0,0 +1,209 @@
+import ipaddress
+import re
+from sqlalchemy import and_, case, column, or_, table, text
+from database import db
+from models import Task, Deployment, Incident, RCA, Asset
+
+# Columns covered by full-text search for each searchable model
+SEARCH_COLUMNS = {
+    Task: ('name', 'description', 'priority', 'status'),
+    Deployment: ('name', 'description', 'status', 'backup_location'),
+    Incident: ('name', 'description', 'severity', 'status'),
+    RCA: ('root_cause', 'corrective_actions', 'preventive_actions', 'status'),
+    Asset: ('server_name', 'asset_id', 'serial_number', 'ip_address', 'host_name',
+            'operating_system', 'vendor', 'make_model', 'asset_type', 'purpose')
+}
+
+# None until the first search works out which engine this database offers
+_index_backend = None
+
+def _sqlite_ddl(table_name, columns):
+    fts = f'{table_name}_fts'
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({column_list}, "
+        f"content='{table_name}', content_rowid='id', tokenize='unicode61')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+    ]
+
+def _postgres_document(columns, row='NEW'):
+    prefix = f'{row}.' if row else ''
+    return " || ' ' || ".join(f"coalesce({prefix}{column}::text, '')" for column in columns)
+
+def _postgres_ddl(table_name, columns):
+    function = f'{table_name}_search_vector_update'
+    return [
+        f'ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS search_vector tsvector',
+        f'CREATE INDEX IF NOT EXISTS ix_{table_name}_search_vector ON {table_name} USING GIN (search_vector)',
+        f"CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$ BEGIN "
+        f"NEW.search_vector := to_tsvector('simple', {_postgres_document(columns)}); "
+        f"RETURN NEW; END $$ LANGUAGE plpgsql",
+        f'DROP TRIGGER IF EXISTS {table_name}_search_vector_trigger ON {table_name}',
+        f'CREATE TRIGGER {table_name}_search_vector_trigger BEFORE INSERT OR UPDATE ON {table_name} '
+        f'FOR EACH ROW EXECUTE FUNCTION {function}()',
+        # Only rows from before the trigger existed; the trigger keeps the rest current
+        f"UPDATE {table_name} SET search_vector = to_tsvector('simple', {_postgres_document(columns, row=None)}) "
+        f'WHERE search_vector IS NULL'
+    ]
+
+def ensure_search_index():
+    """Create the full-text index and its sync triggers for the configured backend.
+
+    SQLite gets FTS5 tables over the entity tables, PostgreSQL a trigger-fed
+    tsvector column with a GIN index. Other backends keep the ILIKE search.
+    """
+    global _index_backend
+    dialect = db.engine.dialect.name
+
+    with db.engine.begin() as connection:
+        if dialect == 'sqlite':
+            existing = {row[0] for row in connection.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%_fts'"
+            ))}
+            for model, columns in SEARCH_COLUMNS.items():
+                if f'{model.__tablename__}_fts' not in existing:
+                    for statement in _sqlite_ddl(model.__tablename__, columns):
+                        connection.execute(text(statement))
+        elif dialect == 'postgresql':
+            for model, columns in SEARCH_COLUMNS.items():
+                for statement in _postgres_ddl(model.__tablename__, columns):
+                    connection.execute(text(statement))
+
+    _index_backend = None
+
+def _detect_backend():
+    dialect = db.engine.dialect.name
+    tables = [model.__tablename__ for model in SEARCH_COLUMNS]
+    if dialect == 'sqlite':
+        found = db.session.execute(text(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN "
+            f"({', '.join(repr(f'{table}_fts') for table in tables)})"
+        )).scalar()
+        return 'fts5' if found == len(tables) else 'like'
+    if dialect == 'postgresql':
+        found = db.session.execute(text(
+            "SELECT count(*) FROM information_schema.columns WHERE column_name = 'search_vector' "
+            f"AND table_name IN ({', '.join(repr(table) for table in tables)})"
+        )).scalar()
+        return 'tsvector' if found == len(tables) else 'like'
+    return 'like'
+
+def index_backend():
+    global _index_backend
+    if _index_backend is None:
+        _index_backend = _detect_backend()
+    return _index_backend
+
+def _terms(search_text):
+    return [term for term in search_text.split() if re.search(r'\w', term)]
+
+def _fts5_query(terms):
+    # Each term becomes a quoted prefix phrase, so operators typed by users are inert
+    return ' AND '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+def _tsquery(terms):
+    cleaned = [re.sub(r"[&|!():*'\\<>]", ' ', term).split() for term in terms]
+    return ' & '.join(f'{word}:*' for words in cleaned for word in words)
+
+def text_search(model, search_text):
+    """Query for rows of model matching search_text, best matches first"""
+    table_name = model.__tablename__
+    terms = _terms(search_text)
+    backend = index_backend()
+
+    if backend == 'fts5' and terms:
+        fts = f'{table_name}_fts'
+        fts_table = table(fts, column('rowid'))
+        return model.query.join(
+            fts_table, fts_table.c.rowid == model.id
+        ).filter(
+            text(f'{fts} MATCH :fts_query').bindparams(fts_query=_fts5_query(terms))
+        ).order_by(text(f'{fts}.rank'))
+
+    if backend == 'tsvector' and terms:
+        tsquery = _tsquery(terms)
+        if tsquery:
+            return model.query.filter(
+                text(f"{table_name}.search_vector @@ to_tsquery('simple', :tsquery)").bindparams(tsquery=tsquery)
+            ).order_by(
+                text(f"ts_rank({table_name}.search_vector, to_tsquery('simple', :tsquery)) DESC").bindparams(tsquery=tsquery)
+            )
+
+    return model.query.filter(or_(*[
+        getattr(model, name).ilike(f'%{search_text}%') for name in SEARCH_COLUMNS[model]
+    ]))
+
+# Four parts, or up to three ending in a dot: "1.2.3" is more likely a version than an address
+_partial_ipv4 = re.compile(r'^(\d{1,3}(\.\d{1,3}){3}|\d{1,3}(\.\d{1,3}){0,2}\.)$')
+_partial_ipv6 = re.compile(r'^[0-9a-f]{0,4}(:[0-9a-f]{0,4}){2,7}$', re.IGNORECASE)
+_fqdn = re.compile(r'^(?=.{4,253}$)([a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z][a-z0-9-]{0,62}\.?$', re.IGNORECASE)
+# Letters and digits, optionally joined by separators, like A-0001 or SN12345
+_tag = re.compile(r'^(?=.{3,50}$)(?=.*\d)(?=.*[a-z])[a-z0-9]+([._/-][a-z0-9]+)*$', re.IGNORECASE)
+
+def classify_identifier(search_text):
+    """What kind of identifier search_text looks like, or None.
+
+    Returns (kind, exact) where kind is 'ip', 'hostname' or 'tag' (an asset
+    id or serial number) and exact says whether only whole values can match.
+    """
+    if not search_text or any(character.isspace() for character in search_text):
+        return None
+    try:
+        ipaddress.ip_address(search_text)
+        return 'ip', True
+    except ValueError:
+        pass
+    if _partial_ipv4.match(search_text) or _partial_ipv6.match(search_text):
+        return 'ip', False
+    if _fqdn.match(search_text):
+        # A trailing dot marks a fully qualified name
+        return 'hostname', search_text.endswith('.')
+    if _tag.match(search_text):
+        return 'tag', False
+    return None
+
+# Identifier kind -> indexed Asset columns it is looked up in
+IDENTIFIER_COLUMNS = {
+    'ip': ('ip_address',),
+    'hostname': ('host_name',),
+    'tag': ('asset_id', 'serial_number')
+}
+
+def _prefix_match(column, prefix):
+    # A range rather than LIKE so a plain b-tree index serves it on every backend
+    return and_(column >= prefix, column < prefix + '\uffff')
+
+def identifier_search(search_text):
+    """Asset lookup on indexed identifier columns when search_text is an identifier.
+
+    Returns (kind, query) with exact matches ordered first, or None when the
+    text should go through full-text search instead.
+    """
+    classified = classify_identifier(search_text)
+    if classified is None:
+        return None
+    kind, exact = classified
+    if kind == 'hostname':
+        # Stored names never carry the root dot
+        search_text = search_text.rstrip('.')
+
+    # Identifiers are stored in either case, so the lookup does not depend on how they were typed
+    variants = {search_text, search_text.lower(), search_text.upper()}
+    columns = [getattr(Asset, name) for name in IDENTIFIER_COLUMNS[kind]]
+    conditions = []
+    for column_attr in columns:
+        for variant in variants:
+            conditions.append(column_attr == variant if exact else _prefix_match(column_attr, variant))
+
+    exact_match = or_(*[column_attr.in_(variants) for column_attr in columns])
+    query = Asset.query.filter(or_(*conditions)).order_by(case((exact_match, 0), else_=1), Asset.id)
+    return kind, query
@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+import zlib
+from flask import Response, request, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_CHUNK_SIZE = 500
+
+def wants_stream():
+    """True when the client asked for a streamed collection"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+def stream_ndjson(query, model, serialize=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Stream query results as newline-delimited JSON, one object per row.
+
+    Rows are fetched from the database chunk_size at a time and written out as
+    each chunk is serialized, so memory use does not grow with the table.
+    serialize defaults to the model's to_dict.
+    """
+    if serialize is None:
+        serialize = model.to_dict
+
+    def generate():
+        lines = []
+        for row in query.order_by(model.id).yield_per(chunk_size):
+            lines.append(json.dumps(serialize(row)))
+            if len(lines) >= chunk_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+def csv_chunks(rows, header, chunk_size=STREAM_CHUNK_SIZE):
+    """Render rows as CSV text, one string per chunk_size rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def gzip_chunks(chunks, level=6):
+    """gzip-compress a stream of text chunks incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file that holds what is written to it until drained"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(self._chunks[-1])
+        return len(self._chunks[-1])
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def accepts_gzip():
+    return request.accept_encodings['gzip'] > 0
+
+def stream_csv(rows, header, filename, chunk_size=STREAM_CHUNK_SIZE):
+    """Stream rows as a CSV attachment, gzip-encoded when the client accepts it.
+
+    Rows are rendered chunk_size at a time as they are pulled from rows, so
+    memory use does not grow with the export.
+    """
+    chunks = csv_chunks(rows, header, chunk_size)
+    compress = accepts_gzip()
+    if compress:
+        chunks = gzip_chunks(chunks)
+
+    response = Response(stream_with_context(chunks), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def stream_attachment(chunks, mimetype, filename):
+    """Stream binary chunks as a file attachment"""
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
@@ -0,0 +1,192 @@
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from database import db
+from models import Task, Deployment, Incident, Asset, Tombstone
+from changes import on_commit
+
+# Suggestion type -> (model, indexed columns, owner columns). The first
+# indexed column is the value shown to the user.
+SUGGESTION_SOURCES = {
+    'task': (Task, ('name',), ('assigned_to', 'created_by')),
+    'deployment': (Deployment, ('name',), ('deployed_by',)),
+    'incident': (Incident, ('name',), ('assigned_to', 'created_by')),
+    'asset': (Asset, ('server_name', 'asset_id'), ('owner_id',))
+}
+
+# Keys are truncated to this many characters to bound memory; longer
+# prefixes are confirmed against the full value
+MAX_KEY_LENGTH = 24
+# Words per value that can start a match, besides the value itself
+MAX_WORD_KEYS = 6
+REFRESH_SECONDS = 5
+
+_word_start = re.compile(r'(?<=[^0-9a-z])[0-9a-z]')
+
+def _keys_for(text):
+    text = (text or '').lower()
+    if not text:
+        return []
+    starts = [0] + [match.start() for match in _word_start.finditer(text)][:MAX_WORD_KEYS]
+    return sorted({text[start:start + MAX_KEY_LENGTH] for start in starts})
+
+class SuggestionIndex:
+    """Per-process sorted-key index answering autocomplete prefix lookups.
+
+    Every value is indexed by its own prefix and by the prefix of each word
+    in it. The index loads on first use, then catches up with rows changed
+    since its last sync (updated_at and tombstones) at most every few
+    seconds, or straight after this process commits a change to an indexed
+    table. Lookups themselves never query the database, and never wait for
+    a refresh's queries: those run outside the lock lookups take.
+    """
+
+    def __init__(self, refresh_seconds=REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        # Held for a whole refresh so only one runs at a time
+        self._sync_lock = threading.Lock()
+        self._entries = {kind: {} for kind in SUGGESTION_SOURCES}
+        self._keys = {kind: [] for kind in SUGGESTION_SOURCES}
+        self._synced_at = None
+        self._synced_versions = None
+        self._next_refresh = 0
+
+    def mark_stale(self):
+        self._next_refresh = 0
+
+    def _remove(self, kind, record_id):
+        entry = self._entries[kind].pop(record_id, None)
+        if entry is None:
+            return
+        keys = self._keys[kind]
+        for key in entry[2]:
+            position = bisect_left(keys, (key, record_id))
+            if position < len(keys) and keys[position] == (key, record_id):
+                del keys[position]
+
+    @staticmethod
+    def _entry(values, owner_ids):
+        keys = sorted({key for value in values for key in _keys_for(value)})
+        owner_ids = frozenset(owner_id for owner_id in owner_ids if owner_id is not None)
+        return (values[0], owner_ids, keys, [(value or '').lower() for value in values])
+
+    def _put(self, kind, record_id, entry):
+        self._remove(kind, record_id)
+        self._entries[kind][record_id] = entry
+        for key in entry[2]:
+            insort(self._keys[kind], (key, record_id))
+
+    def _build(self, rows, column_count):
+        """Entries and sorted keys for rows, sorting all the keys once"""
+        entries = {}
+        keys = []
+        for row in rows:
+            entry = self._entry(row[1:1 + column_count], row[1 + column_count:])
+            entries[row[0]] = entry
+            keys.extend((key, row[0]) for key in entry[2])
+        keys.sort()
+        return entries, keys
+
+    def _due(self, versions):
+        return time.monotonic() >= self._next_refresh or (
+            versions is not None and versions != self._synced_versions
+        )
+
+    def sync(self, versions=None):
+        """Load the index, or apply changes committed since the last sync.
+
+        versions, the indexed tables' versions read by the caller, forces a
+        refresh as soon as they differ from those seen at the last one.
+        """
+        if not self._due(versions):
+            return
+
+        with self._sync_lock:
+            if not self._due(versions):
+                return
+            started_at = datetime.utcnow()
+            since = None
+            if self._synced_at is not None:
+                # Overlap so rows committed while the last sync ran are not missed
+                since = self._synced_at - timedelta(seconds=self.refresh_seconds)
+
+            loaded = {}
+            updated = {}
+            for kind, (model, columns, owner_columns) in SUGGESTION_SOURCES.items():
+                query = db.session.query(
+                    model.id,
+                    *[getattr(model, column) for column in columns],
+                    *[getattr(model, column) for column in owner_columns]
+                )
+                if since is None:
+                    loaded[kind] = self._build(query.all(), len(columns))
+                    continue
+
+                changed = [
+                    (row[0], self._entry(row[1:1 + len(columns)], row[1 + len(columns):]))
+                    for row in query.filter(model.updated_at > since).all()
+                ]
+                deleted = db.session.query(Tombstone.record_id).filter(
+                    Tombstone.table_name == model.__tablename__,
+                    Tombstone.kind == 'deleted',
+                    Tombstone.deleted_at > since
+                ).all()
+                updated[kind] = (changed, [record_id for record_id, in deleted])
+
+            # Only swapping in the results holds up lookups
+            with self._lock:
+                for kind, (entries, keys) in loaded.items():
+                    self._entries[kind] = entries
+                    self._keys[kind] = keys
+                for kind, (changed, deleted) in updated.items():
+                    for record_id, entry in changed:
+                        self._put(kind, record_id, entry)
+                    for record_id in deleted:
+                        self._remove(kind, record_id)
+
+            self._synced_at = started_at
+            self._synced_versions = versions
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+
+    def lookup(self, kind, prefix, limit, owner_id=None):
+        """Up to limit (value, id) pairs of kind matching prefix.
+
+        With owner_id, only records that user owns are returned.
+        """
+        prefix = prefix.lower()
+        key_prefix = prefix[:MAX_KEY_LENGTH]
+        results = []
+        seen = set()
+
+        with self._lock:
+            keys = self._keys[kind]
+            entries = self._entries[kind]
+            position = bisect_left(keys, (key_prefix,))
+            while position < len(keys) and len(results) < limit:
+                key, record_id = keys[position]
+                position += 1
+                if not key.startswith(key_prefix):
+                    break
+                if record_id in seen:
+                    continue
+                seen.add(record_id)
+                value, owner_ids, _, lowered_values = entries[record_id]
+                if owner_id is not None and owner_id not in owner_ids:
+                    continue
+                if len(prefix) > MAX_KEY_LENGTH and not any(prefix in text for text in lowered_values):
+                    continue
+                results.append((value, record_id))
+
+        return results
+
+suggestion_index = SuggestionIndex()
+
+_indexed_tables = {model.__tablename__ for model, _, _ in SUGGESTION_SOURCES.values()}
+
+@on_commit
+def _refresh_after_local_changes(changes):
+    if any(change.table_name in _indexed_tables for change in changes):
+        suggestion_index.mark_stale()
@@ -0,0 +1,56 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, create_tables
+from database import db
+from models import User
+
+PASSWORD = 'password123'
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """One application and SQLite database for the whole run.
+
+    Module-level caches live for the process, so tests share the database
+    and create the rows they assert on instead of relying on fixed counts.
+    """
+    directory = tmp_path_factory.mktemp('app')
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{directory / 'test.db'}",
+        'BCRYPT_LOG_ROUNDS': 4,
+        'EXPORT_DIR': str(directory / 'exports')
+    })
+    create_tables(app)
+    with app.app_context():
+        for username, role in [('manager', 'manager'), ('member', 'member'), ('other', 'member')]:
+            user = User(username=username, email=f'{username}@example.com', role=role)
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.commit()
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture(scope='session')
+def user_ids(app):
+    with app.app_context():
+        return {user.username: user.id for user in User.query.all()}
+
+def login(client, username, password=PASSWORD):
+    response = client.post('/api/auth/login', json={'username': username, 'password': password})
+    assert response.status_code == 200, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+@pytest.fixture
+def manager(client):
+    return login(client, 'manager')
+
+@pytest.fixture
+def member(client):
+    return login(client, 'member')
@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta
+
+def critical_incidents(client, headers):
+    response = client.get('/api/reports/analytics?days=3', headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['analytics']['incidents']['severity_distribution'].get('critical', 0)
+
+def test_activity_is_counted_inside_the_window_only(client, manager):
+    before = critical_incidents(client, manager)
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    # One day past each edge of the three day window, and each edge itself
+    for offset in (-3, -2, 0, 1):
+        created = client.post('/api/incidents/', json={
+            'name': f'windowed incident {offset}', 'description': 'windowed', 'severity': 'critical',
+            'incident_date': (today + timedelta(days=offset)).isoformat()
+        }, headers=manager)
+        assert created.status_code == 201
+
+    assert critical_incidents(client, manager) == before + 2
+
+def test_members_cannot_read_analytics(client, member):
+    assert client.get('/api/reports/analytics', headers=member).status_code == 403
@@ -0,0 +1,72 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import charts
+from charts import ChartRenderer
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Renders run on threads here; each call is recorded and waits for release"""
+    calls = []
+    release = threading.Event()
+
+    def fake_render(chart_type, data, title, labels=None):
+        calls.append(title)
+        release.wait(5)
+        return f'png:{title}'
+
+    monkeypatch.setattr(charts, 'render_chart', fake_render)
+    return calls, release
+
+def thread_renderer(**kwargs):
+    renderer = ChartRenderer(**kwargs)
+    renderer._pool = ThreadPoolExecutor(max_workers=4)
+    renderer._pool_pid = os.getpid()
+    return renderer
+
+def test_finished_charts_are_served_from_the_lru(renders):
+    calls, release = renders
+    release.set()
+    renderer = thread_renderer(cache_size=2)
+
+    assert renderer.render('bar', [1, 2], 'a') == 'png:a'
+    renderer.render('bar', [1, 2], 'b')
+    assert renderer.render('bar', [1, 2], 'a') == 'png:a'
+    renderer.render('bar', [1, 2], 'c')
+    # b was the least recently used
+    renderer.render('bar', [1, 2], 'b')
+
+    assert calls == ['a', 'b', 'c', 'b']
+    assert renderer.stats()['hits'] == 1
+
+def test_concurrent_requests_share_one_render(renders):
+    calls, release = renders
+    renderer = thread_renderer()
+    results = []
+    waiters = [
+        threading.Thread(target=lambda: results.append(renderer.render('pie', [3, 4], 'shared')))
+        for _ in range(3)
+    ]
+    for waiter in waiters:
+        waiter.start()
+    while renderer.stats()['shared_renders'] < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for waiter in waiters:
+        waiter.join(timeout=5)
+
+    assert calls == ['shared']
+    assert results == ['png:shared'] * 3
+    assert renderer.stats()['in_flight'] == 0
+
+def test_a_forked_process_makes_its_own_pool(renders, monkeypatch):
+    calls, release = renders
+    renderer = thread_renderer()
+    renderer._in_flight['stale'] = object()
+    renderer._pool_pid = os.getpid() + 1
+    monkeypatch.setattr(renderer, '_get_pool', lambda: ThreadPoolExecutor(max_workers=1))
+    release.set()
+
+    assert renderer.render('line', [1], 'child') == 'png:child'
+    assert 'stale' not in renderer._in_flight
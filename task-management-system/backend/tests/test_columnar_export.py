@@ -0,0 +1,76 @@
+import csv
+import io
+from decimal import Decimal
+import pytest
+from database import db
+from exports import EXPORTS
+from models import Asset
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+def read_parquet(client, headers, report_type):
+    response = client.post('/api/reports/export/parquet', json={'type': report_type}, headers=headers)
+    assert response.status_code == 200, response.data[:200]
+    return pq.read_table(io.BytesIO(response.data))
+
+def read_arrow(client, headers, report_type):
+    response = client.post('/api/reports/export/arrow', json={'type': report_type}, headers=headers)
+    assert response.status_code == 200, response.data[:200]
+    assert response.mimetype == 'application/vnd.apache.arrow.file'
+    return pa.ipc.open_file(io.BytesIO(response.data)).read_all()
+
+@pytest.mark.parametrize('report_type', sorted(EXPORTS))
+def test_parquet_and_arrow_carry_the_same_table(client, manager, report_type):
+    parquet = read_parquet(client, manager, report_type)
+    arrow = read_arrow(client, manager, report_type)
+    assert parquet.schema.equals(arrow.schema)
+    assert parquet.equals(arrow)
+
+def test_columns_keep_their_database_types(app, client, manager, user_ids):
+    with app.app_context():
+        db.session.add(Asset(
+            server_name='typed', asset_id='T-0001', asset_type='server', owner_id=user_ids['manager'],
+            asset_value=Decimal('1234.50'), asset_value_rating='high'
+        ))
+        db.session.commit()
+
+    table = read_parquet(client, manager, 'assets')
+    schema = table.schema
+    assert pa.types.is_decimal(schema.field('asset_value').type)
+    assert pa.types.is_timestamp(schema.field('created_at').type)
+    assert pa.types.is_dictionary(schema.field('asset_value_rating').type)
+
+    row = next(row for row in table.to_pylist() if row['asset_id'] == 'T-0001')
+    assert row['asset_value'] == Decimal('1234.50')
+    assert row['asset_value_rating'] == 'high'
+    assert row['asset_owner_username'] == 'manager'
+
+def test_rows_match_the_csv_export_scope(client, member):
+    body = client.post('/api/reports/export/csv', json={'type': 'tasks'}, headers=member).data.decode('utf-8')
+    csv_rows = list(csv.reader(io.StringIO(body)))[1:]
+    assert read_parquet(client, member, 'tasks').num_rows == len(csv_rows)
+
+def test_unknown_format_and_type_are_rejected(client, manager):
+    assert client.post('/api/reports/export/arrow', json={'type': 'nope'}, headers=manager).status_code == 400
+    assert client.post('/api/reports/export/orc', json={'type': 'tasks'}, headers=manager).status_code in (404, 405)
+
+def test_values_dropped_from_an_enum_export_as_null(app, client, manager, user_ids):
+    with app.app_context():
+        # Written before 'blocked' was removed from the task statuses
+        db.session.execute(db.text(
+            "INSERT INTO tasks (name, status, priority, created_by) VALUES ('legacy status', 'blocked', 'high', :user_id)"
+        ), {'user_id': user_ids['manager']})
+        db.session.commit()
+    try:
+        for table in (read_parquet(client, manager, 'tasks'), read_arrow(client, manager, 'tasks')):
+            row = next(row for row in table.to_pylist() if row['name'] == 'legacy status')
+            assert row['status'] is None
+            assert row['priority'] == 'high'
+
+        body = client.post('/api/reports/export/csv', json={'type': 'tasks'}, headers=manager).data.decode('utf-8')
+        assert 'legacy status' in body and 'blocked' in body
+    finally:
+        with app.app_context():
+            db.session.execute(db.text("DELETE FROM tasks WHERE name = 'legacy status'"))
+            db.session.commit()
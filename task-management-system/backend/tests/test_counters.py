@@ -0,0 +1,41 @@
+from counters import TALLIES, counter_drift
+from database import db
+from models import Task
+
+def drift(app):
+    with app.app_context():
+        return {tally.name: counter_drift(tally) for tally in TALLIES}
+
+def test_writes_through_the_api_keep_counts_in_step(app, client, manager, user_ids):
+    created = client.post('/api/tasks/', json={'name': 'counted task', 'assigned_to': user_ids['member']}, headers=manager)
+    assert created.status_code == 201
+    task_id = created.get_json()['task']['id']
+    assert client.put(f'/api/tasks/{task_id}', json={'status': 'completed'}, headers=manager).status_code == 200
+    assert client.put(f'/api/tasks/{task_id}', json={'assigned_to': user_ids['other']}, headers=manager).status_code == 200
+    assert client.delete(f'/api/tasks/{task_id}', headers=manager).status_code == 200
+    assert client.post('/api/incidents/', json={'name': 'counted incident', 'description': 'disk full', 'severity': 'high'}, headers=manager).status_code == 201
+
+    assert drift(app) == {tally.name: {} for tally in TALLIES}
+
+def test_verify_reports_out_of_band_edits_until_rebuilt(app, client, manager):
+    assert client.post('/api/tasks/', json={'name': 'edited behind our back'}, headers=manager).status_code == 201
+    with app.app_context():
+        # Bypasses the ORM, as a restore or a manual fix would
+        db.session.execute(Task.__table__.update().values(status='overdue'))
+        db.session.commit()
+    assert drift(app)['status_counters']
+
+    runner = app.test_cli_runner()
+    verify = runner.invoke(args=['counters', 'verify'])
+    assert verify.exit_code != 0
+    assert 'have drifted' in verify.output
+
+    rebuild = runner.invoke(args=['counters', 'rebuild'])
+    assert rebuild.exit_code == 0, rebuild.output
+    verify = runner.invoke(args=['counters', 'verify'])
+    assert verify.exit_code == 0, verify.output
+    assert drift(app) == {tally.name: {} for tally in TALLIES}
+
+def test_shared_columns_load_their_previous_value_once():
+    # Both the tallies and the member scope tombstones need assigned_to
+    assert len(Task.assigned_to.dispatch.set) == 1
@@ -0,0 +1,49 @@
+import csv
+import gzip
+import io
+import pytest
+from database import db
+from exports import EXPORTS
+from models import Task
+
+def export_csv(client, headers, report_type, encoding='identity'):
+    response = client.post('/api/reports/export/csv', json={'type': report_type},
+                           headers={**headers, 'Accept-Encoding': encoding})
+    assert response.status_code == 200, response.data[:200]
+    assert response.mimetype == 'text/csv'
+    body = response.data
+    if encoding == 'gzip':
+        assert response.headers['Content-Encoding'] == 'gzip'
+        body = gzip.decompress(body)
+    else:
+        assert 'Content-Encoding' not in response.headers
+    return list(csv.reader(io.StringIO(body.decode('utf-8'))))
+
+@pytest.mark.parametrize('report_type', sorted(EXPORTS))
+def test_every_report_exports_its_header(client, manager, report_type):
+    rows = export_csv(client, manager, report_type)
+    assert rows[0] == [header for header, _ in EXPORTS[report_type].columns]
+
+def test_rows_are_scoped_to_the_caller(app, client, manager, member, user_ids):
+    with app.app_context():
+        db.session.add_all([
+            Task(name='exported mine', created_by=user_ids['manager'], assigned_to=user_ids['member']),
+            Task(name='exported theirs', created_by=user_ids['manager'], assigned_to=user_ids['other'])
+        ])
+        db.session.commit()
+        total = Task.query.count()
+        assigned = Task.query.filter_by(assigned_to=user_ids['member']).count()
+
+    name = [path for _, path in EXPORTS['tasks'].columns].index('name')
+    manager_rows = export_csv(client, manager, 'tasks')[1:]
+    member_rows = export_csv(client, member, 'tasks')[1:]
+    assert len(manager_rows) == total
+    assert len(member_rows) == assigned
+    assert 'exported mine' in [row[name] for row in member_rows]
+    assert 'exported theirs' not in [row[name] for row in member_rows]
+
+def test_gzip_is_negotiated_and_carries_the_same_rows(client, manager):
+    assert export_csv(client, manager, 'tasks', 'gzip') == export_csv(client, manager, 'tasks')
+
+def test_unknown_report_type_is_rejected(client, manager):
+    assert client.post('/api/reports/export/csv', json={'type': 'nope'}, headers=manager).status_code == 400
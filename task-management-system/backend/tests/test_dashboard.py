@@ -0,0 +1,47 @@
+import dashboard
+from types import SimpleNamespace
+from counters import ALL_SCOPE
+from dashboard import DashboardCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_least_recently_used_scopes_are_evicted():
+    cache = DashboardCache(max_entries=2)
+    cache.put('user:1', (), {'n': 1})
+    cache.put('user:2', (), {'n': 2})
+    assert cache.get('user:1', ()) == ({'n': 1}, False)
+    cache.put('user:3', (), {'n': 3})
+
+    assert cache.get('user:2', ()) is None
+    assert cache.get('user:1', ()) == ({'n': 1}, False)
+    assert cache.get('user:3', ()) == ({'n': 3}, False)
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['evictions'] == 1
+
+def test_out_of_date_entries_are_served_within_max_staleness(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(dashboard, 'time', SimpleNamespace(monotonic=clock))
+    cache = DashboardCache(ttl=60)
+    cache.put(ALL_SCOPE, (('tasks', 1),), {'n': 1})
+
+    # Another worker's write moved the versions on
+    assert cache.get(ALL_SCOPE, (('tasks', 2),)) is None
+    clock.now += 4
+    assert cache.get(ALL_SCOPE, (('tasks', 2),), max_staleness=5) == ({'n': 1}, True)
+    clock.now += 1
+    assert cache.get(ALL_SCOPE, (('tasks', 2),), max_staleness=5) is None
+
+def test_commits_in_this_process_invalidate_matching_scopes():
+    cache = DashboardCache()
+    cache.put(ALL_SCOPE, (), {'n': 1})
+    cache.put('user:1', (), {'n': 2})
+    cache.invalidate_tables({'rca'})
+
+    # Member dashboards have no RCA section
+    assert cache.get(ALL_SCOPE, ()) is None
+    assert cache.get('user:1', ()) == ({'n': 2}, False)
@@ -0,0 +1,39 @@
+from changes import get_table_versions
+
+def test_unchanged_list_answers_if_none_match_with_304(client, manager):
+    first = client.get('/api/tasks/', headers=manager)
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    etag = first.headers['ETag']
+
+    repeat = client.get('/api/tasks/', headers={**manager, 'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.data == b''
+    assert repeat.headers['ETag'] == etag
+
+def test_write_to_the_table_changes_the_etag(app, client, manager):
+    etag = client.get('/api/tasks/', headers=manager).headers['ETag']
+    with app.app_context():
+        version = get_table_versions(['tasks'])['tasks']
+
+    created = client.post('/api/tasks/', json={'name': 'etag task'}, headers=manager)
+    assert created.status_code == 201
+
+    with app.app_context():
+        assert get_table_versions(['tasks'])['tasks'] == version + 1
+    response = client.get('/api/tasks/', headers={**manager, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_write_to_another_table_keeps_the_etag(client, manager):
+    etag = client.get('/api/tasks/', headers=manager).headers['ETag']
+    created = client.post('/api/deployments/', json={'name': 'etag deployment'}, headers=manager)
+    assert created.status_code == 201
+    assert client.get('/api/tasks/', headers={**manager, 'If-None-Match': etag}).status_code == 304
+
+def test_etags_differ_per_caller_and_url(client, manager, member):
+    manager_etag = client.get('/api/tasks/', headers=manager).headers['ETag']
+    member_response = client.get('/api/tasks/', headers={**member, 'If-None-Match': manager_etag})
+    assert member_response.status_code == 200
+    assert member_response.headers['ETag'] != manager_etag
+    assert client.get('/api/tasks/?limit=1', headers={**manager, 'If-None-Match': manager_etag}).status_code == 200
@@ -0,0 +1,61 @@
+import json
+import os
+import time
+import uuid
+import pytest
+from jobs import JOB_STALL_SECONDS, ExportJobs
+
+def wait_for(client, headers, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get(f'/api/reports/jobs/{job_id}', headers=headers)
+        assert response.status_code == 200, response.get_json()
+        job = response.get_json()['job']
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    pytest.fail(f'export job {job_id} did not finish')
+
+def test_pdf_export_runs_as_a_job_and_downloads(client, manager):
+    response = client.post('/api/reports/export/pdf', json={'type': 'tasks'}, headers=manager)
+    assert response.status_code == 202
+    job = wait_for(client, manager, response.get_json()['job']['id'])
+    assert job['status'] == 'done', job['error']
+    assert job['rows_done'] == job['rows_total']
+
+    download = client.get(job['download_url'], headers=manager)
+    assert download.status_code == 200
+    assert download.mimetype == 'application/pdf'
+    assert download.data.startswith(b'%PDF')
+
+def test_identical_requests_share_a_job_until_data_changes(client, manager):
+    first = client.post('/api/reports/export/pdf', json={'type': 'deployments'}, headers=manager).get_json()['job']
+    wait_for(client, manager, first['id'])
+    again = client.post('/api/reports/export/pdf', json={'type': 'deployments'}, headers=manager).get_json()['job']
+    assert again['id'] == first['id']
+
+    assert client.post('/api/deployments/', json={'name': 'invalidates export'}, headers=manager).status_code == 201
+    changed = client.post('/api/reports/export/pdf', json={'type': 'deployments'}, headers=manager).get_json()['job']
+    assert changed['id'] != first['id']
+    wait_for(client, manager, changed['id'])
+
+def test_jobs_are_private_to_their_scope(client, manager, member):
+    job = client.post('/api/reports/export/csv', json={'type': 'assets', 'background': True}, headers=manager).get_json()['job']
+    wait_for(client, manager, job['id'])
+    assert client.get(f"/api/reports/jobs/{job['id']}", headers=member).status_code == 404
+    assert client.get(f"/api/reports/jobs/{job['id']}/download", headers=member).status_code == 404
+    assert client.get('/api/reports/jobs/not-a-job', headers=manager).status_code == 404
+
+@pytest.mark.parametrize('pid, silent_for, status', [
+    (os.getpid(), 0, 'queued'),
+    # A live pid may belong to another process by now; the heartbeat decides
+    (os.getpid(), JOB_STALL_SECONDS + 1, 'failed'),
+    (None, 0, 'failed'),
+])
+def test_queued_jobs_are_given_up_without_a_heartbeat(tmp_path, pid, silent_for, status):
+    jobs = ExportJobs(str(tmp_path))
+    job_id = uuid.uuid4().hex
+    with open(tmp_path / f'{job_id}.json', 'w') as output:
+        json.dump({'id': job_id, 'status': 'queued', 'pid': pid, 'updated_at': time.time() - silent_for,
+                   'expires_at': None}, output)
+    assert jobs.get(job_id)['status'] == status
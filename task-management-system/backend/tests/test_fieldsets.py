@@ -0,0 +1,42 @@
+import json
+import pytest
+from database import db
+from models import Asset
+
+@pytest.fixture(scope='module')
+def asset(app, user_ids):
+    with app.app_context():
+        asset = Asset(server_name='fielded', asset_id='F-0001', asset_type='server',
+                      ip_address='10.9.0.1', owner_id=user_ids['member'])
+        db.session.add(asset)
+        db.session.commit()
+        return asset.id
+
+def find(rows, asset_id):
+    return next(row for row in rows if row['id'] == asset_id)
+
+def test_fields_limit_the_serialized_keys_and_always_keep_the_id(client, manager, asset):
+    rows = client.get('/api/assets/?fields=server_name,ip_address&limit=1000', headers=manager).get_json()['assets']
+    assert find(rows, asset) == {'id': asset, 'server_name': 'fielded', 'ip_address': '10.9.0.1'}
+
+def test_owner_field_loads_the_owner(client, manager, asset):
+    rows = client.get('/api/assets/?fields=owner&limit=1000', headers=manager).get_json()['assets']
+    full = client.get(f'/api/assets/{asset}', headers=manager).get_json()['asset']
+    assert find(rows, asset) == {'id': asset, 'owner': full['owner']}
+    assert full['owner'] is not None
+
+def test_fields_apply_to_streamed_lists(client, manager, asset):
+    response = client.get('/api/assets/?fields=asset_id&stream=1', headers=manager)
+    rows = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+    assert find(rows, asset) == {'id': asset, 'asset_id': 'F-0001'}
+
+def test_fields_apply_to_search_results(client, manager, asset):
+    body = client.get('/api/search/?q=fielded&type=assets&fields=server_name', headers=manager).get_json()
+    assert body['results']['assets'] == [{'id': asset, 'server_name': 'fielded'}]
+
+@pytest.mark.parametrize('path', ['/api/assets/', '/api/search/?q=fielded&'])
+def test_unknown_fields_are_rejected(client, manager, path):
+    separator = '' if path.endswith('&') else '?'
+    response = client.get(f'{path}{separator}fields=server_name,password_hash', headers=manager)
+    assert response.status_code == 400
+    assert 'password_hash' in response.get_json()['error']
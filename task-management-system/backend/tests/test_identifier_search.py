@@ -0,0 +1,70 @@
+import pytest
+from database import db
+from models import Asset
+from search_index import classify_identifier, identifier_search
+
+@pytest.mark.parametrize('search_text, expected', [
+    ('10.20.3.14', ('ip', True)),
+    ('10.20.', ('ip', False)),
+    ('10.20.3.1', ('ip', True)),
+    ('1.2.3', None),
+    ('10', None),
+    ('fe80::1', ('ip', True)),
+    ('::1', ('ip', True)),
+    ('2001:db8:', ('ip', False)),
+    ('fe80:', None),
+    ('web01.corp.local', ('hostname', False)),
+    ('web01.corp.local.', ('hostname', True)),
+    ('example.', None),
+    ('A-0003', ('tag', False)),
+    ('SN12345', ('tag', False)),
+    ('2024', None),
+    ('v2', None),
+    ('a--1', None),
+    ('hello world', None),
+    ('', None),
+])
+def test_classify_identifier(search_text, expected):
+    assert classify_identifier(search_text) == expected
+
+@pytest.fixture(scope='module')
+def assets(app, user_ids):
+    with app.app_context():
+        rows = [
+            Asset(server_name='id web01', asset_id='ID-0001', asset_type='server', host_name='web01.corp.local',
+                  ip_address='10.77.0.1', owner_id=user_ids['manager']),
+            Asset(server_name='id web010', asset_id='ID-0010', asset_type='server', host_name='web010.corp.local',
+                  ip_address='10.77.0.10', serial_number='sn-77', owner_id=user_ids['manager']),
+            Asset(server_name='id v6', asset_id='ID-0600', asset_type='server', ip_address='fe80::77',
+                  owner_id=user_ids['manager'])
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        return {asset.asset_id: asset.id for asset in rows}
+
+def lookup(app, search_text):
+    with app.app_context():
+        kind, query = identifier_search(search_text)
+        return kind, [asset.id for asset in query]
+
+def test_prefix_lookup_puts_the_exact_match_first(app, assets):
+    kind, ids = lookup(app, '10.77.0.1')
+    assert kind == 'ip'
+    assert ids == [assets['ID-0001']]
+
+    kind, ids = lookup(app, '10.77.0.')
+    assert ids == [assets['ID-0001'], assets['ID-0010']]
+
+    kind, ids = lookup(app, 'web01.corp')
+    assert kind == 'hostname'
+    assert ids == [assets['ID-0001']]
+
+def test_fully_qualified_names_match_exactly(app, assets):
+    assert lookup(app, 'web01.corp.local.') == ('hostname', [assets['ID-0001']])
+
+def test_tags_match_either_column_in_any_case(app, assets):
+    assert lookup(app, 'id-001') == ('tag', [assets['ID-0010']])
+    assert lookup(app, 'SN-77') == ('tag', [assets['ID-0010']])
+
+def test_ipv6_lookup(app, assets):
+    assert lookup(app, 'fe80::77') == ('ip', [assets['ID-0600']])
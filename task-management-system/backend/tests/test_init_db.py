@@ -0,0 +1,23 @@
+from sqlalchemy import inspect
+from app import create_app
+from database import db
+from models import User
+
+def test_init_db_creates_the_schema_and_can_run_again(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'fresh.db'}",
+        'BCRYPT_LOG_ROUNDS': 4,
+        'EXPORT_DIR': str(tmp_path / 'exports')
+    })
+    runner = app.test_cli_runner()
+
+    for _ in range(2):
+        result = runner.invoke(args=['init-db'])
+        assert result.exit_code == 0, result.output
+        assert 'Database is up to date' in result.output
+
+    with app.app_context():
+        tables = set(inspect(db.engine).get_table_names())
+        assert {'users', 'tasks', 'status_counters', 'daily_rollups', 'table_versions'} <= tables
+        assert [user.username for user in User.query.all()] == ['superadmin']
@@ -0,0 +1,58 @@
+import pytest
+from database import db
+from models import Task
+from pagination import encode_cursor
+
+@pytest.fixture
+def tasks(app, user_ids):
+    with app.app_context():
+        for i in range(7):
+            db.session.add(Task(
+                name=f'paged task {i}',
+                created_by=user_ids['manager'],
+                assigned_to=user_ids['member'] if i % 2 else user_ids['manager']
+            ))
+        db.session.commit()
+        return {
+            'all': [task.id for task in Task.query.order_by(Task.id)],
+            'member': [task.id for task in Task.query.filter_by(assigned_to=user_ids['member']).order_by(Task.id)]
+        }
+
+def walk(client, headers, params=''):
+    ids, cursor, pages = [], None, 0
+    while True:
+        url = f'/api/tasks/?limit=3{params}' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        assert len(body['tasks']) <= 3
+        ids.extend(task['id'] for task in body['tasks'])
+        pages += 1
+        cursor = body['next_cursor']
+        if cursor is None:
+            return ids, pages
+
+def test_cursor_walk_returns_every_row_once_in_id_order(client, manager, tasks):
+    ids, pages = walk(client, manager)
+    assert ids == tasks['all']
+    assert pages == -(-len(tasks['all']) // 3)
+
+def test_descending_walk_repeats_the_order_on_later_pages(client, manager, tasks):
+    ids, _ = walk(client, manager, '&order=desc')
+    assert ids == sorted(tasks['all'], reverse=True)
+
+def test_members_page_through_their_own_rows_only(client, member, tasks):
+    ids, _ = walk(client, member)
+    assert ids == tasks['member']
+
+def test_cursor_seeks_past_the_encoded_id(client, manager, tasks):
+    middle = tasks['all'][len(tasks['all']) // 2]
+    body = client.get(f'/api/tasks/?limit=1000&cursor={encode_cursor(middle)}', headers=manager).get_json()
+    assert [task['id'] for task in body['tasks']] == [task_id for task_id in tasks['all'] if task_id > middle]
+    assert body['next_cursor'] is None
+
+@pytest.mark.parametrize('params', ['limit=0', 'limit=abc', 'cursor=not-a-cursor', 'order=sideways'])
+def test_invalid_page_arguments_are_rejected(client, manager, params):
+    response = client.get(f'/api/tasks/?{params}', headers=manager)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,48 @@
+import math
+import re
+from database import db
+from exports import PDF_PAGE_ROWS, FlowableStream, write_pdf
+from models import Task
+
+def test_flowable_stream_pulls_one_item_at_a_time():
+    pulled = []
+
+    def source():
+        for item in range(3):
+            pulled.append(item)
+            yield item
+
+    stream = FlowableStream(source())
+    assert pulled == []
+    assert len(stream) == 1 and pulled == [0]
+    # Reading again does not pull more until the front item is taken
+    assert len(stream) == 1
+    assert stream.pop(0) == 0
+    assert len(stream) == 1 and pulled == [0, 1]
+    # Platypus checks the length before taking each flowable
+    taken = []
+    while len(stream):
+        taken.append(stream.pop(0))
+    assert taken == [1, 2] and pulled == [0, 1, 2]
+
+def test_long_reports_are_laid_out_one_page_table_at_a_time(app, user_ids, tmp_path):
+    with app.app_context():
+        for i in range(2 * PDF_PAGE_ROWS + 5):
+            db.session.add(Task(name=f'paged task {i}', created_by=user_ids['manager']))
+        db.session.commit()
+
+        reported = []
+        path = tmp_path / 'tasks.pdf'
+        write_pdf(str(path), 'tasks', 'manager', user_ids['manager'], lambda done, total: reported.append((done, total)),
+                  {'summary': False})
+
+    total = reported[0][1]
+    assert total >= 2 * PDF_PAGE_ROWS + 5
+    assert [done for done, _ in reported[1:-1]] == [PDF_PAGE_ROWS * page for page in range(1, total // PDF_PAGE_ROWS + 1)]
+    assert reported[-1] == (total, total)
+
+    document = path.read_bytes()
+    assert document.startswith(b'%PDF')
+    # Each page table fills a page of its own
+    pages = len(re.findall(rb'/Type /Page\b(?!s)', document))
+    assert pages >= math.ceil(total / PDF_PAGE_ROWS)
@@ -0,0 +1,81 @@
+import pytest
+import routes.search
+from search_cache import search_cache
+from database import add_to_row, db
+from models import Asset, Task, Deployment, TableVersion
+
+@pytest.fixture(scope='module')
+def pelican(app, user_ids):
+    """Five pelican tasks (two of them the member's) and one pelican deployment"""
+    with app.app_context():
+        for i in range(5):
+            db.session.add(Task(name=f'pelican task {i}', created_by=user_ids['manager'],
+                                assigned_to=user_ids['member'] if i < 2 else user_ids['manager']))
+        db.session.add(Deployment(name='pelican rollout', deployed_by=user_ids['manager']))
+        db.session.commit()
+
+def search(client, headers, params):
+    response = client.get(f'/api/search/?{params}', headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def test_every_entity_type_is_searched_and_counted(client, manager, pelican):
+    body = search(client, manager, 'q=pelican')
+    assert body['totals']['tasks'] == 5
+    assert body['totals']['deployments'] == 1
+    assert body['total_results'] == 6
+    assert body['matched_on'] is None
+
+def test_pages_follow_next_offset_per_type(client, manager, pelican):
+    seen = []
+    offset = 0
+    while offset is not None:
+        body = search(client, manager, f'q=pelican&type=tasks&limit=2&offset={offset}')
+        assert len(body['results']['tasks']) <= 2
+        seen.extend(task['id'] for task in body['results']['tasks'])
+        offset = body['next_offset']['tasks']
+    assert len(seen) == len(set(seen)) == 5
+
+def test_members_search_within_their_scope(client, member, pelican):
+    body = search(client, member, 'q=pelican')
+    assert body['totals']['tasks'] == 2
+    assert body['totals']['deployments'] == 0
+
+def test_totals_stop_at_the_count_cap(client, manager, pelican, monkeypatch):
+    monkeypatch.setattr(routes.search, 'SEARCH_COUNT_CAP', 3)
+    search_cache.clear()
+    body = search(client, manager, 'q=pelican&type=tasks&limit=1')
+    assert body['totals']['tasks'] == 3
+
+def test_limit_is_capped(client, manager, pelican, monkeypatch):
+    monkeypatch.setattr(routes.search, 'MAX_SEARCH_LIMIT', 2)
+    search_cache.clear()
+    body = search(client, manager, 'q=pelican&type=tasks&limit=50')
+    assert len(body['results']['tasks']) == 2
+    assert body['next_offset']['tasks'] == 2
+
+@pytest.mark.parametrize('params', ['q=', 'q=pelican&limit=0', 'q=pelican&offset=-1', 'q=pelican&limit=x'])
+def test_invalid_search_arguments_are_rejected(client, manager, params):
+    assert client.get(f'/api/search/?{params}', headers=manager).status_code == 400
+
+def test_mixed_case_identifiers_are_cached_as_typed(app, client, manager, user_ids):
+    with app.app_context():
+        db.session.add(Asset(server_name='cased host', asset_id='CASE-0001', asset_type='server',
+                             host_name='Mixed01.Corp.local', owner_id=user_ids['manager']))
+        db.session.commit()
+    # Only the typed, lower and upper case are tried, so the lower case misses
+    assert search(client, manager, 'q=mixed01.corp.local&type=assets')['matched_on'] is None
+    assert search(client, manager, 'q=Mixed01.Corp.local&type=assets')['matched_on'] == 'hostname'
+
+def test_suggestions_follow_writes_from_other_workers(app, client, manager, user_ids):
+    def suggested():
+        response = client.get('/api/search/suggestions?q=cormorant', headers=manager)
+        return [suggestion['value'] for suggestion in response.get_json()['suggestions']]
+
+    assert suggested() == []
+    # Written the way another worker would be: no commit listeners run here
+    with app.app_context():
+        db.session.execute(Task.__table__.insert().values(name='cormorant audit', created_by=user_ids['manager']))
+        add_to_row(db.session.connection(), TableVersion.__table__, {'table_name': 'tasks'}, 'version', 1)
+        db.session.commit()
+    assert suggested() == ['cormorant audit']
@@ -0,0 +1,57 @@
+import pytest
+from database import db
+from models import Task
+from search_index import SEARCH_COLUMNS, _postgres_ddl, _tsquery, index_backend, text_search
+
+def matching_ids(app, search_text):
+    with app.app_context():
+        return [task.id for task in text_search(Task, search_text).all()]
+
+@pytest.fixture
+def task_id(app, user_ids):
+    with app.app_context():
+        task = Task(name='quarterly firewall audit', description='rotate certificates', created_by=user_ids['manager'])
+        db.session.add(task)
+        db.session.commit()
+        return task.id
+
+def test_sqlite_uses_fts5(app):
+    with app.app_context():
+        assert index_backend() == 'fts5'
+
+def test_triggers_keep_the_index_in_step_with_writes(app, task_id):
+    assert task_id in matching_ids(app, 'firewall')
+    # Terms match as prefixes, in any column, all of them required
+    assert task_id in matching_ids(app, 'quart certif')
+    assert task_id not in matching_ids(app, 'firewall unrelated')
+
+    with app.app_context():
+        db.session.get(Task, task_id).name = 'quarterly router audit'
+        db.session.commit()
+    assert task_id not in matching_ids(app, 'firewall')
+    assert task_id in matching_ids(app, 'router')
+
+    with app.app_context():
+        db.session.delete(db.session.get(Task, task_id))
+        db.session.commit()
+    assert task_id not in matching_ids(app, 'router')
+
+def test_query_syntax_typed_by_users_is_inert(app, task_id):
+    assert task_id in matching_ids(app, '"firewall')
+    for search_text in ['NEAR(firewall', 'fire*wall', 'audit -x', 'name:firewall']:
+        # Would be a syntax error if passed to MATCH unquoted
+        matching_ids(app, search_text)
+
+def test_postgres_ddl_adds_a_trigger_fed_indexed_vector():
+    statements = _postgres_ddl('tasks', SEARCH_COLUMNS[Task])
+    assert statements[0] == 'ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector'
+    assert 'USING GIN (search_vector)' in statements[1]
+    assert "NEW.search_vector := to_tsvector('simple', coalesce(NEW.name::text, '')" in statements[2]
+    assert 'BEFORE INSERT OR UPDATE ON tasks' in statements[4]
+    # The backfill only fills rows written before the trigger existed
+    assert statements[-1].startswith('UPDATE tasks SET search_vector')
+    assert statements[-1].endswith('WHERE search_vector IS NULL')
+
+def test_tsquery_strips_operators_and_matches_prefixes():
+    assert _tsquery(['fire&wall', "o'brien", '(audit)']) == 'fire:* & wall:* & o:* & brien:* & audit:*'
+    assert _tsquery(['!|']) == ''
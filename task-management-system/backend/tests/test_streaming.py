@@ -0,0 +1,44 @@
+import json
+import pytest
+from database import db
+from models import Task
+
+@pytest.fixture
+def tasks(app, user_ids):
+    with app.app_context():
+        for i in range(3):
+            db.session.add(Task(name=f'streamed task {i}', created_by=user_ids['manager'], assigned_to=user_ids['member']))
+        db.session.commit()
+        return {
+            'all': [task.id for task in Task.query.order_by(Task.id)],
+            'member': [task.id for task in Task.query.filter_by(assigned_to=user_ids['member']).order_by(Task.id)]
+        }
+
+def read_ndjson(response):
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+
+def test_stream_parameter_returns_one_object_per_line_in_id_order(client, manager, tasks):
+    rows = read_ndjson(client.get('/api/tasks/?stream=1', headers=manager))
+    assert [row['id'] for row in rows] == tasks['all']
+    assert rows[0].keys() == client.get('/api/tasks/?limit=1', headers=manager).get_json()['tasks'][0].keys()
+
+def test_accept_header_selects_the_stream(client, manager, tasks):
+    rows = read_ndjson(client.get('/api/tasks/', headers={**manager, 'Accept': 'application/x-ndjson'}))
+    assert [row['id'] for row in rows] == tasks['all']
+
+def test_streams_keep_member_scope(client, member, tasks):
+    rows = read_ndjson(client.get('/api/tasks/?stream=true', headers=member))
+    assert [row['id'] for row in rows] == tasks['member']
+
+@pytest.mark.parametrize('path', ['/api/assets/', '/api/incidents/'])
+def test_other_streamed_lists(client, manager, path):
+    response = client.get(f'{path}?stream=1', headers=manager)
+    ids = [row['id'] for row in read_ndjson(response)]
+    assert ids == sorted(ids)
+
+def test_json_stays_the_default(client, manager, tasks):
+    response = client.get('/api/tasks/', headers=manager)
+    assert response.mimetype == 'application/json'
+    assert 'next_cursor' in response.get_json()
@@ -0,0 +1,42 @@
+import threading
+from database import db
+from models import Task
+from suggestion_index import SuggestionIndex
+
+def test_initial_load_and_later_changes(app, user_ids):
+    index = SuggestionIndex()
+    with app.app_context():
+        task = Task(name='Kestrel migration', created_by=user_ids['manager'], assigned_to=user_ids['member'])
+        db.session.add(task)
+        db.session.commit()
+        index.sync()
+        assert index.lookup('task', 'kes', 10) == [('Kestrel migration', task.id)]
+        # Words inside the value start matches too
+        assert index.lookup('task', 'migr', 10) == [('Kestrel migration', task.id)]
+        assert index.lookup('task', 'kes', 10, owner_id=user_ids['member']) == [('Kestrel migration', task.id)]
+        assert index.lookup('task', 'kes', 10, owner_id=user_ids['other']) == []
+
+        task.name = 'Osprey migration'
+        db.session.commit()
+        index.mark_stale()
+        index.sync()
+        assert index.lookup('task', 'kes', 10) == []
+        assert index.lookup('task', 'osp', 10) == [('Osprey migration', task.id)]
+
+        db.session.delete(task)
+        db.session.commit()
+        index.mark_stale()
+        index.sync()
+        assert index.lookup('task', 'osp', 10) == []
+
+def test_lookups_do_not_wait_for_a_refresh(app):
+    index = SuggestionIndex()
+    with app.app_context():
+        index.sync()
+    # A refresh holds the sync lock while it queries; lookups only need the data lock
+    with index._sync_lock:
+        result = []
+        lookup = threading.Thread(target=lambda: result.append(index.lookup('task', 'a', 5)))
+        lookup.start()
+        lookup.join(timeout=5)
+        assert result, 'lookup blocked behind the refresh'
@@ -0,0 +1,123 @@
+import base64
+from datetime import datetime, timedelta, timezone
+import pytest
+from database import db
+from models import Task, Tombstone
+
+def sync(client, headers, params=''):
+    response = client.get(f'/api/sync/?{params}', headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def sync_token(client, headers):
+    body = sync(client, headers, 'limit=1000')
+    while body['next_cursor']:
+        body = sync(client, headers, f"limit=1000&cursor={body['next_cursor']}")
+    return body['next_token']
+
+@pytest.fixture
+def member_task(app, user_ids):
+    with app.app_context():
+        task = Task(name='synced task', created_by=user_ids['manager'], assigned_to=user_ids['member'])
+        db.session.add(task)
+        db.session.commit()
+        return task.id
+
+def test_full_sync_pages_through_every_visible_row(app, client, manager, member_task):
+    seen = {}
+    body = sync(client, manager, 'limit=4')
+    while True:
+        for key, rows in body['changes'].items():
+            seen.setdefault(key, []).extend(row['id'] for row in rows)
+        if not body['next_cursor']:
+            break
+        assert body['next_token'] is None
+        body = sync(client, manager, f"limit=4&cursor={body['next_cursor']}")
+
+    assert body['next_token']
+    with app.app_context():
+        assert sorted(seen['tasks']) == [task.id for task in Task.query.order_by(Task.id)]
+    assert all(len(ids) == len(set(ids)) for ids in seen.values())
+
+def test_delta_sync_reports_changed_rows_and_deletions(client, manager, member_task):
+    token = sync_token(client, manager)
+
+    assert client.put(f'/api/tasks/{member_task}', json={'name': 'renamed'}, headers=manager).status_code == 200
+    body = sync(client, manager, f'since={token}')
+    assert member_task in [task['id'] for task in body['changes']['tasks']]
+
+    assert client.delete(f'/api/tasks/{member_task}', headers=manager).status_code == 200
+    body = sync(client, manager, f'since={token}')
+    assert member_task in body['deleted']['tasks']
+    assert member_task not in [task['id'] for task in body['changes']['tasks']]
+
+def test_row_leaving_a_members_scope_is_deleted_for_them_only(app, client, manager, member, user_ids, member_task):
+    member_token = sync_token(client, member)
+    manager_token = sync_token(client, manager)
+
+    response = client.put(f'/api/tasks/{member_task}', json={'assigned_to': user_ids['other']}, headers=manager)
+    assert response.status_code == 200
+
+    body = sync(client, member, f'since={member_token}')
+    assert member_task in body['deleted']['tasks']
+    assert member_task not in [task['id'] for task in body['changes']['tasks']]
+
+    # Deletions are applied before changed rows, so the manager keeps the row
+    body = sync(client, manager, f'since={manager_token}')
+    assert member_task in [task['id'] for task in body['changes']['tasks']]
+    with app.app_context():
+        scope_exit = Tombstone.query.filter_by(table_name='tasks', record_id=member_task, kind='left_scope').one()
+        assert scope_exit.scope_user_id == user_ids['member']
+
+def test_token_older_than_retention_must_resync(app, client, manager, monkeypatch):
+    token = sync_token(client, manager)
+    monkeypatch.setitem(app.config, 'SYNC_RETENTION_DAYS', 0)
+    response = client.get(f'/api/sync/?since={token}', headers=manager)
+    assert response.status_code == 410
+    assert response.get_json()['resync'] is True
+
+@pytest.mark.parametrize('params', ['since=garbage', 'cursor=garbage', 'limit=0'])
+def test_invalid_sync_arguments_are_rejected(client, manager, params):
+    assert client.get(f'/api/sync/?{params}', headers=manager).status_code == 400
+
+def test_tokens_with_a_utc_offset_are_read_as_utc(client, manager, member_task):
+    token = base64.urlsafe_b64encode(
+        (datetime.utcnow() - timedelta(minutes=1)).replace(tzinfo=timezone.utc).astimezone(
+            timezone(timedelta(hours=2))
+        ).isoformat().encode('utf-8')
+    ).decode('ascii')
+    assert client.put(f'/api/tasks/{member_task}', json={'name': 'offset'}, headers=manager).status_code == 200
+    body = sync(client, manager, f'since={token}')
+    assert member_task in [task['id'] for task in body['changes']['tasks']]
+
+def test_prune_command_removes_only_tombstones_past_retention(app, user_ids):
+    with app.app_context():
+        old, recent = [Task(name=name, created_by=user_ids['manager']) for name in ('old', 'recent')]
+        db.session.add_all([old, recent])
+        db.session.commit()
+        ids = [old.id, recent.id]
+        db.session.delete(old)
+        db.session.delete(recent)
+        db.session.commit()
+        Tombstone.query.filter_by(table_name='tasks', record_id=ids[0]).update(
+            {'deleted_at': datetime.utcnow() - timedelta(days=app.config['SYNC_RETENTION_DAYS'] + 1)}
+        )
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['tombstones', 'prune'])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        remaining = {tombstone.record_id for tombstone in Tombstone.query.filter_by(table_name='tasks')}
+    assert ids[0] not in remaining
+    assert ids[1] in remaining
+
+def test_sync_requests_leave_expired_tombstones_to_the_prune_command(app, client, manager):
+    with app.app_context():
+        expired = Tombstone(table_name='tasks', record_id=0, kind='deleted',
+                            deleted_at=datetime.utcnow() - timedelta(days=app.config['SYNC_RETENTION_DAYS'] + 1))
+        db.session.add(expired)
+        db.session.commit()
+        tombstone_id = expired.id
+    sync(client, manager)
+    with app.app_context():
+        assert db.session.get(Tombstone, tombstone_id) is not None
@@ -0,0 +1,58 @@
+import itertools
+import pytest
+from conftest import PASSWORD, login
+from database import db
+from models import User
+
+_names = itertools.count()
+
+@pytest.fixture
+def account(app):
+    """A user of its own, so changing it leaves the shared accounts alone"""
+    username = f'revocable{next(_names)}'
+    with app.app_context():
+        user = User(username=username, email=f'{username}@example.com', role='supervisor')
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        return user.id, username
+
+def update_user(app, user_id, **values):
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        for name, value in values.items():
+            setattr(user, name, value)
+        db.session.commit()
+
+def test_role_change_revokes_issued_tokens(app, client, account, manager):
+    user_id, username = account
+    headers = login(client, username)
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+    update_user(app, user_id, role='member')
+
+    response = client.get('/api/auth/me', headers=headers)
+    assert response.status_code == 401
+    assert response.get_json()['error'] == 'Your access has changed, please log in again'
+    # Other users' tokens are untouched
+    assert client.get('/api/auth/me', headers=manager).status_code == 200
+
+    fresh = login(client, username)
+    assert client.get('/api/auth/me', headers=fresh).get_json()['user']['role'] == 'member'
+
+def test_deactivation_revokes_issued_tokens(app, client, account):
+    user_id, username = account
+    headers = login(client, username)
+
+    update_user(app, user_id, is_active=False)
+
+    assert client.get('/api/auth/me', headers=headers).status_code == 401
+    assert client.post('/api/auth/login', json={'username': username, 'password': PASSWORD}).status_code == 401
+
+def test_other_profile_changes_keep_tokens_valid(app, client, account):
+    user_id, username = account
+    headers = login(client, username)
+
+    update_user(app, user_id, first_name='Renamed')
+
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
@@ -48,16 +48,14 @@ const Dashboard: React.FC = () => {
       setLoading(true);
       const [dashboardResponse, tasksResponse] = await Promise.all([
         reportsAPI.getDashboard(),
-        user?.role === 'member' ? tasksAPI.getMyTasks() : tasksAPI.getTasks()
+        // Newest first: the five most recent tasks, not the first page of the oldest
+        user?.role === 'member'
+          ? tasksAPI.getMyTasks({ limit: 5, order: 'desc' })
+          : tasksAPI.getTasks({ limit: 5, order: 'desc' })
       ]);
       
       setDashboardData(dashboardResponse.dashboard);
-      
-      // Get recent tasks (last 5)
-      const sortedTasks = tasksResponse.tasks
-        .sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime())
-        .slice(0, 5);
-      setRecentTasks(sortedTasks);
+      setRecentTasks(tasksResponse.tasks);
       
     } catch (err: any) {
       setError(err.response?.data?.error || 'Failed to load dashboard data');
@@ -34,6 +34,8 @@ const AssetsPage: React.FC = () => {
   const [assets, setAssets] = useState<Asset[]>([]);
   const [users, setUsers] = useState<User[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [dialogOpen, setDialogOpen] = useState(false);
   const [editingAsset, setEditingAsset] = useState<Asset | null>(null);
@@ -78,6 +80,7 @@ const AssetsPage: React.FC = () => {
       setLoading(true);
       const response = await assetsAPI.getAssets();
       setAssets(response.assets);
+      setNextCursor(response.next_cursor);
     } catch (err: any) {
       setError(err.response?.data?.error || 'Failed to load assets');
     } finally {
@@ -85,11 +88,25 @@ const AssetsPage: React.FC = () => {
     }
   };
 
+  const loadMoreAssets = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await assetsAPI.getAssets({ cursor: nextCursor });
+      setAssets(previous => [...previous, ...response.assets]);
+      setNextCursor(response.next_cursor);
+    } catch (err: any) {
+      setError(err.response?.data?.error || 'Failed to load more assets');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchUsers = async () => {
     try {
       if (user?.role !== 'member') {
-        const response = await usersAPI.getUsers();
-        setUsers(response.users);
+        // Every user, so assignees past the first page can be picked
+        setUsers(await usersAPI.getAllUsers());
       }
     } catch (err: any) {
       console.error('Failed to load users:', err);
@@ -292,6 +309,14 @@ const AssetsPage: React.FC = () => {
         />
       </Paper>
 
+      {nextCursor && (
+        <Box display="flex" justifyContent="center" mt={2}>
+          <Button onClick={loadMoreAssets} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </Button>
+        </Box>
+      )}
+
       {/* Asset Dialog */}
       <Dialog open={dialogOpen} onClose={handleCloseDialog} maxWidth="lg" fullWidth>
         <DialogTitle>
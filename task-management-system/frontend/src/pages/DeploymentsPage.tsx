@@ -30,6 +30,8 @@ import { Deployment } from '../types';
 const DeploymentsPage: React.FC = () => {
   const [deployments, setDeployments] = useState<Deployment[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [dialogOpen, setDialogOpen] = useState(false);
   const [editingDeployment, setEditingDeployment] = useState<Deployment | null>(null);
@@ -47,6 +49,7 @@ const DeploymentsPage: React.FC = () => {
       setLoading(true);
       const response = await deploymentsAPI.getDeployments();
       setDeployments(response.deployments);
+      setNextCursor(response.next_cursor);
     } catch (err: any) {
       setError(err.response?.data?.error || 'Failed to load deployments');
     } finally {
@@ -54,6 +57,20 @@ const DeploymentsPage: React.FC = () => {
     }
   };
 
+  const loadMoreDeployments = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await deploymentsAPI.getDeployments({ cursor: nextCursor });
+      setDeployments(previous => [...previous, ...response.deployments]);
+      setNextCursor(response.next_cursor);
+    } catch (err: any) {
+      setError(err.response?.data?.error || 'Failed to load more deployments');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchDeployments();
   }, [user]);
@@ -214,6 +231,14 @@ const DeploymentsPage: React.FC = () => {
         />
       </Paper>
 
+      {nextCursor && (
+        <Box display="flex" justifyContent="center" mt={2}>
+          <Button onClick={loadMoreDeployments} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </Button>
+        </Box>
+      )}
+
       {/* Deployment Dialog */}
       <Dialog open={dialogOpen} onClose={handleCloseDialog} maxWidth="md" fullWidth>
         <DialogTitle>
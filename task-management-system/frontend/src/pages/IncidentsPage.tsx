@@ -32,6 +32,8 @@ const IncidentsPage: React.FC = () => {
   const [incidents, setIncidents] = useState<Incident[]>([]);
   const [users, setUsers] = useState<User[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [dialogOpen, setDialogOpen] = useState(false);
   const [editingIncident, setEditingIncident] = useState<Incident | null>(null);
@@ -50,6 +52,7 @@ const IncidentsPage: React.FC = () => {
       setLoading(true);
       const response = await incidentsAPI.getIncidents();
       setIncidents(response.incidents);
+      setNextCursor(response.next_cursor);
     } catch (err: any) {
       setError(err.response?.data?.error || 'Failed to load incidents');
     } finally {
@@ -57,11 +60,25 @@ const IncidentsPage: React.FC = () => {
     }
   };
 
+  const loadMoreIncidents = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await incidentsAPI.getIncidents({ cursor: nextCursor });
+      setIncidents(previous => [...previous, ...response.incidents]);
+      setNextCursor(response.next_cursor);
+    } catch (err: any) {
+      setError(err.response?.data?.error || 'Failed to load more incidents');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchUsers = async () => {
     try {
       if (user?.role !== 'member') {
-        const response = await usersAPI.getUsers();
-        setUsers(response.users);
+        // Every user, so assignees past the first page can be picked
+        setUsers(await usersAPI.getAllUsers());
       }
     } catch (err: any) {
       console.error('Failed to load users:', err);
@@ -269,6 +286,14 @@ const IncidentsPage: React.FC = () => {
         />
       </Paper>
 
+      {nextCursor && (
+        <Box display="flex" justifyContent="center" mt={2}>
+          <Button onClick={loadMoreIncidents} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </Button>
+        </Box>
+      )}
+
       {/* Incident Dialog */}
       <Dialog open={dialogOpen} onClose={handleCloseDialog} maxWidth="md" fullWidth>
         <DialogTitle>
@@ -39,6 +39,8 @@ const TasksPage: React.FC = () => {
   const [tasks, setTasks] = useState<Task[]>([]);
   const [users, setUsers] = useState<User[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [dialogOpen, setDialogOpen] = useState(false);
   const [editingTask, setEditingTask] = useState<Task | null>(null);
@@ -59,6 +61,7 @@ const TasksPage: React.FC = () => {
         ? await tasksAPI.getMyTasks()
         : await tasksAPI.getTasks();
       setTasks(response.tasks);
+      setNextCursor(response.next_cursor);
     } catch (err: any) {
       setError(err.response?.data?.error || 'Failed to load tasks');
     } finally {
@@ -66,11 +69,27 @@ const TasksPage: React.FC = () => {
     }
   };
 
+  const loadMoreTasks = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = user?.role === 'member'
+        ? await tasksAPI.getMyTasks({ cursor: nextCursor })
+        : await tasksAPI.getTasks({ cursor: nextCursor });
+      setTasks(previous => [...previous, ...response.tasks]);
+      setNextCursor(response.next_cursor);
+    } catch (err: any) {
+      setError(err.response?.data?.error || 'Failed to load more tasks');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchUsers = async () => {
     try {
       if (user?.role !== 'member') {
-        const response = await usersAPI.getUsers();
-        setUsers(response.users);
+        // Every user, so assignees past the first page can be picked
+        setUsers(await usersAPI.getAllUsers());
       }
     } catch (err: any) {
       console.error('Failed to load users:', err);
@@ -260,6 +279,14 @@ const TasksPage: React.FC = () => {
         />
       </Paper>
 
+      {nextCursor && (
+        <Box display="flex" justifyContent="center" mt={2}>
+          <Button onClick={loadMoreTasks} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </Button>
+        </Box>
+      )}
+
       {/* Task Dialog */}
       <Dialog open={dialogOpen} onClose={handleCloseDialog} maxWidth="md" fullWidth>
         <DialogTitle>
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { LoginRequest, LoginResponse, User, Task, Deployment, Incident, RCA, Asset, SearchResult, DashboardData } from '../types';
+import { LoginRequest, LoginResponse, User, Task, Deployment, Incident, RCA, Asset, SearchResult, DashboardData, PageParams, ExportJob } from '../types';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000/api';
 
@@ -45,9 +45,24 @@ export const authAPI = {
 };
 
 // Users API
+// Largest page the API serves; pickers follow next_cursor until every user is loaded
+const USER_PICKER_PAGE_SIZE = 1000;
+
 export const usersAPI = {
-  getUsers: (): Promise<{ users: User[] }> =>
-    api.get('/users').then(res => res.data),
+  getUsers: (params?: PageParams): Promise<{ users: User[]; next_cursor: string | null }> =>
+    api.get('/users', { params }).then(res => res.data),
+  
+  getAllUsers: async (): Promise<User[]> => {
+    const users: User[] = [];
+    let cursor: string | null = null;
+    do {
+      const page: { users: User[]; next_cursor: string | null } =
+        await api.get('/users', { params: { limit: USER_PICKER_PAGE_SIZE, cursor } }).then(res => res.data);
+      users.push(...page.users);
+      cursor = page.next_cursor;
+    } while (cursor);
+    return users;
+  },
   
   createUser: (userData: Partial<User> & { password: string }) =>
     api.post('/users', userData).then(res => res.data),
@@ -64,8 +79,8 @@ export const usersAPI = {
 
 // Tasks API
 export const tasksAPI = {
-  getTasks: (): Promise<{ tasks: Task[] }> =>
-    api.get('/tasks').then(res => res.data),
+  getTasks: (params?: PageParams): Promise<{ tasks: Task[]; next_cursor: string | null }> =>
+    api.get('/tasks', { params }).then(res => res.data),
   
   createTask: (taskData: Partial<Task>) =>
     api.post('/tasks', taskData).then(res => res.data),
@@ -79,14 +94,14 @@ export const tasksAPI = {
   deleteTask: (id: number) =>
     api.delete(`/tasks/${id}`).then(res => res.data),
   
-  getMyTasks: (): Promise<{ tasks: Task[] }> =>
-    api.get('/tasks/my-tasks').then(res => res.data),
+  getMyTasks: (params?: PageParams): Promise<{ tasks: Task[]; next_cursor: string | null }> =>
+    api.get('/tasks/my-tasks', { params }).then(res => res.data),
 };
 
 // Deployments API
 export const deploymentsAPI = {
-  getDeployments: (): Promise<{ deployments: Deployment[] }> =>
-    api.get('/deployments').then(res => res.data),
+  getDeployments: (params?: PageParams): Promise<{ deployments: Deployment[]; next_cursor: string | null }> =>
+    api.get('/deployments', { params }).then(res => res.data),
   
   createDeployment: (deploymentData: Partial<Deployment>) =>
     api.post('/deployments', deploymentData).then(res => res.data),
@@ -103,8 +118,8 @@ export const deploymentsAPI = {
 
 // Incidents API
 export const incidentsAPI = {
-  getIncidents: (): Promise<{ incidents: Incident[] }> =>
-    api.get('/incidents').then(res => res.data),
+  getIncidents: (params?: PageParams): Promise<{ incidents: Incident[]; next_cursor: string | null }> =>
+    api.get('/incidents', { params }).then(res => res.data),
   
   createIncident: (incidentData: Partial<Incident>) =>
     api.post('/incidents', incidentData).then(res => res.data),
@@ -121,8 +136,8 @@ export const incidentsAPI = {
 
 // RCA API
 export const rcaAPI = {
-  getRCAs: (): Promise<{ rcas: RCA[] }> =>
-    api.get('/rca').then(res => res.data),
+  getRCAs: (params?: PageParams): Promise<{ rcas: RCA[]; next_cursor: string | null }> =>
+    api.get('/rca', { params }).then(res => res.data),
   
   createRCA: (rcaData: Partial<RCA>) =>
     api.post('/rca', rcaData).then(res => res.data),
@@ -142,8 +157,8 @@ export const rcaAPI = {
 
 // Assets API
 export const assetsAPI = {
-  getAssets: (): Promise<{ assets: Asset[] }> =>
-    api.get('/assets').then(res => res.data),
+  getAssets: (params?: PageParams): Promise<{ assets: Asset[]; next_cursor: string | null }> =>
+    api.get('/assets', { params }).then(res => res.data),
   
   createAsset: (assetData: Partial<Asset>) =>
     api.post('/assets', assetData).then(res => res.data),
@@ -167,6 +182,20 @@ export const searchAPI = {
     api.get(`/search/suggestions?q=${encodeURIComponent(query)}`).then(res => res.data),
 };
 
+const EXPORT_POLL_INTERVAL_MS = 1000;
+
+// Poll an export job until it finishes, then download its file
+const waitForExport = async (job: ExportJob): Promise<Blob> => {
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise(resolve => setTimeout(resolve, EXPORT_POLL_INTERVAL_MS));
+    job = (await api.get(`/reports/jobs/${job.id}`)).data.job;
+  }
+  if (job.status !== 'done') {
+    throw new Error(job.error || 'Export failed');
+  }
+  return api.get(`/reports/jobs/${job.id}/download`, { responseType: 'blob' }).then(res => res.data);
+};
+
 // Reports API
 export const reportsAPI = {
   getDashboard: (): Promise<{ dashboard: DashboardData }> =>
@@ -178,8 +207,21 @@ export const reportsAPI = {
   exportCSV: (type: string) =>
     api.post('/reports/export/csv', { type }, { responseType: 'blob' }).then(res => res.data),
   
-  exportPDF: (type: string) =>
-    api.post('/reports/export/pdf', { type }, { responseType: 'blob' }).then(res => res.data),
+  exportCSVInBackground: (type: string): Promise<Blob> =>
+    api.post('/reports/export/csv', { type, background: true }).then(res => waitForExport(res.data.job)),
+  
+  exportColumnar: (type: string, format: 'parquet' | 'arrow'): Promise<Blob> =>
+    api.post(`/reports/export/${format}`, { type }, { responseType: 'blob' }).then(res => res.data),
+  
+  exportPDF: (type: string, options?: { includeSummary?: boolean; includeCharts?: boolean }): Promise<Blob> =>
+    api.post('/reports/export/pdf', {
+      type,
+      include_summary: options?.includeSummary ?? true,
+      include_charts: options?.includeCharts ?? false,
+    }).then(res => waitForExport(res.data.job)),
+  
+  getExportJob: (id: string): Promise<{ job: ExportJob }> =>
+    api.get(`/reports/jobs/${id}`).then(res => res.data),
 };
 
 export default api;
\ No newline at end of file
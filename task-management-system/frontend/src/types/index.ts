@@ -7,6 +7,7 @@ export interface User {
   last_name?: string;
   is_active: boolean;
   created_at: string;
+  updated_at?: string;
 }
 
 export interface Task {
@@ -18,6 +19,7 @@ export interface Task {
   due_date?: string;
   completed_at?: string;
   created_at: string;
+  updated_at?: string;
   created_by?: string;
   assigned_to?: string;
 }
@@ -31,6 +33,7 @@ export interface Deployment {
   backup_location?: string;
   deployed_by?: string;
   created_at: string;
+  updated_at?: string;
 }
 
 export interface Incident {
@@ -42,6 +45,7 @@ export interface Incident {
   incident_date: string;
   resolved_at?: string;
   created_at: string;
+  updated_at?: string;
   created_by?: string;
   assigned_to?: string;
 }
@@ -55,6 +59,7 @@ export interface RCA {
   preventive_actions?: string;
   status: 'draft' | 'under_review' | 'approved' | 'implemented';
   created_at: string;
+  updated_at?: string;
   assigned_to?: string;
 }
 
@@ -96,6 +101,25 @@ export interface Asset {
   updated_at: string;
 }
 
+export interface PageParams {
+  limit?: number;
+  cursor?: string | null;
+  order?: 'asc' | 'desc';
+}
+
+export interface ExportJob {
+  id: string;
+  format: string;
+  type: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  rows_done: number;
+  rows_total: number | null;
+  error: string | null;
+  created_at: string;
+  expires_at: string | null;
+  download_url: string | null;
+}
+
 export interface SearchResult {
   tasks: Task[];
   deployments: Deployment[];